@@ -0,0 +1,252 @@
+import math
+import os
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from database import get_daily_sentiment
+from fetch_cache import TTLCache
+from price_store import get_price_store, get_history
+
+# Load environment variables
+load_dotenv()
+
+TRADING_DAYS = 252
+
+# Seconds a cached per-ticker result stays valid
+ANALYTICS_TTL = int(os.getenv('ANALYTICS_TTL_SECONDS', '900'))
+
+REGRESSION_STATS = ['n', 'alpha', 'beta', 'r2', 't_stat', 'corr']
+
+class UniversePanel:
+    """Close prices and daily sentiment for many tickers on one date axis.
+
+    close and sentiment are (dates, tickers) float64 arrays; sentiment is
+    NaN on days without a saved analysis, and close is NaN where a ticker
+    has no bar (e.g. before it listed).
+    """
+
+    def __init__(self, dates, tickers, close, sentiment):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.close = close
+        self.sentiment = sentiment
+        self._fingerprints = None
+
+    @classmethod
+    def from_frames(cls, close, sentiment=None):
+        """Build a panel from (date x ticker) DataFrames, aligning sentiment to the price dates."""
+        close = close.sort_index()
+        if sentiment is None:
+            sentiment = pd.DataFrame(index=close.index, columns=close.columns, dtype=np.float64)
+        sentiment = sentiment.reindex(index=close.index, columns=close.columns)
+        return cls(
+            close.index,
+            close.columns,
+            np.ascontiguousarray(close.to_numpy(dtype=np.float64)),
+            np.ascontiguousarray(sentiment.to_numpy(dtype=np.float64))
+        )
+
+    def returns(self):
+        """Daily log returns; the first row is NaN."""
+        returns = np.full_like(self.close, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.subtract(np.log(self.close[1:]), np.log(self.close[:-1]), out=returns[1:])
+        return returns
+
+    def fingerprints(self):
+        """Per-ticker tuples identifying the data cached results were computed from."""
+        if self._fingerprints is None:
+            span = (str(self.dates[0]), str(self.dates[-1])) if len(self.dates) else (None, None)
+            observed = np.isfinite(self.sentiment)
+            self._fingerprints = [span + columns for columns in zip(
+                np.isfinite(self.close).sum(axis=0).tolist(),
+                np.nansum(self.close[-1:], axis=0).tolist(),
+                observed.sum(axis=0).tolist(),
+                np.where(observed, self.sentiment, 0.0).sum(axis=0).tolist()
+            )]
+        return self._fingerprints
+
+def _day_index(index):
+    # Daily bars and rollup days meet on tz-naive midnight timestamps
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+def load_panel(tickers, period='1y', refresh=False):
+    """Load stored daily closes and saved sentiment for tickers into a UniversePanel.
+
+    Prices come from the local price store (topped up from the provider
+    only when refresh is True) and sentiment from the daily rollups.
+    """
+    tickers = [ticker.upper() for ticker in tickers]
+    store = get_price_store()
+    closes = {}
+    for ticker in tickers:
+        bars = get_history(ticker, period) if refresh else store.read(ticker, period)
+        close = bars['Close'].astype(np.float64)
+        close.index = _day_index(close.index)
+        closes[ticker] = close[~close.index.duplicated(keep='last')]
+    close = pd.DataFrame(closes, columns=tickers)
+
+    rows = get_daily_sentiment(tickers, start=close.index[0].to_pydatetime() if len(close) else None)
+    sentiment = pd.DataFrame(rows, columns=['ticker', 'day', 'sentiment'])
+    sentiment['day'] = _day_index(sentiment['day'])
+    sentiment = sentiment.pivot_table(index='day', columns='ticker', values='sentiment', aggfunc='mean')
+    return UniversePanel.from_frames(close, sentiment)
+
+def _trailing_sums(x, window):
+    """Sums over the trailing window along axis 0; rows before the first full window hold partial sums."""
+    sums = np.cumsum(x, axis=0)
+    sums[window:] -= sums[:-window].copy()
+    return sums
+
+def rolling_volatility(returns, window=20, periods_per_year=TRADING_DAYS):
+    """Annualized rolling standard deviation of returns along axis 0.
+
+    Matches pandas rolling(window).std() * sqrt(periods_per_year): a value
+    needs a full window of non-missing returns. Returns are centred on each
+    column's mean first so the sum-of-squares form keeps full precision.
+    """
+    valid = np.isfinite(returns)
+    observed = valid.sum(axis=0)
+    center = np.where(valid, returns, 0.0).sum(axis=0) / np.maximum(observed, 1)
+    centred = np.where(valid, returns - center, 0.0)
+    counts = _trailing_sums(valid.astype(np.int64), window)
+    s1 = _trailing_sums(centred, window)
+    s2 = _trailing_sums(centred * centred, window)
+    variance = (s2 - s1 * s1 / window) / (window - 1)
+    np.maximum(variance, 0.0, out=variance)
+    volatility = np.sqrt(variance) * math.sqrt(periods_per_year)
+    volatility[counts < window] = np.nan
+    volatility[:window - 1] = np.nan
+    return volatility
+
+def _shift_forward(y, lag):
+    """y[t + lag] aligned to row t (NaN past the end)."""
+    if lag == 0:
+        return y
+    shifted = np.full_like(y, np.nan)
+    if lag < len(y):
+        shifted[:len(y) - lag] = y[lag:]
+    return shifted
+
+def _pairwise_moments(x, y):
+    """Pairwise-complete count, means and centred sums of squares/products along axis -2."""
+    mask = np.isfinite(x) & np.isfinite(y)
+    n = mask.sum(axis=-2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.where(mask, x, 0.0).sum(axis=-2) / n
+        mean_y = np.where(mask, y, 0.0).sum(axis=-2) / n
+    dx = np.where(mask, x - np.expand_dims(mean_x, -2), 0.0)
+    dy = np.where(mask, y - np.expand_dims(mean_y, -2), 0.0)
+    return n, mean_x, mean_y, (dx * dx).sum(axis=-2), (dy * dy).sum(axis=-2), (dx * dy).sum(axis=-2)
+
+def lagged_correlations(x, y, lags):
+    """Pearson correlation of x[t] with y[t + lag] for each lag and column.
+
+    x and y are (dates, tickers); the result is (len(lags), tickers), using
+    the dates where both values exist for each pair.
+    """
+    shifted = np.stack([_shift_forward(y, lag) for lag in lags])
+    n, _, _, sxx, syy, sxy = _pairwise_moments(x[np.newaxis], shifted)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = sxy / np.sqrt(sxx * syy)
+    corr[n < 3] = np.nan
+    return corr
+
+def regression_stats(x, y):
+    """Per-column OLS of y on x: (6, tickers) rows of n, alpha, beta, r2, t_stat, corr."""
+    n, mean_x, mean_y, sxx, syy, sxy = _pairwise_moments(x, y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = sxy / sxx
+        alpha = mean_y - beta * mean_x
+        corr = sxy / np.sqrt(sxx * syy)
+        residual = np.maximum(syy - beta * sxy, 0.0)
+        t_stat = beta / np.sqrt(residual / (n - 2) / sxx)
+    stats = np.stack([n.astype(np.float64), alpha, beta, corr * corr, t_stat, corr])
+    stats[1:, n < 3] = np.nan
+    return stats
+
+# Per-(ticker, window) results shared by every UniverseAnalytics
+analytics_cache = TTLCache(max_entries=16384)
+
+class UniverseAnalytics:
+    """Vectorized sentiment/price research statistics over a UniversePanel.
+
+    Every statistic is computed for all requested tickers at once with
+    array operations. Results are cached per (ticker, window, statistic)
+    together with a fingerprint of the ticker's data, so repeated or
+    overlapping universe queries only compute the tickers they have not
+    seen since the data last changed.
+    """
+
+    def __init__(self, panel, cache=analytics_cache, ttl=ANALYTICS_TTL):
+        self.panel = panel
+        self.cache = cache
+        self.ttl = ttl
+        self._returns = None
+
+    def returns(self):
+        if self._returns is None:
+            self._returns = self.panel.returns()
+        return self._returns
+
+    def _target(self, target, window, columns):
+        if target == 'return':
+            return self.returns()[:, columns]
+        if target == 'volatility':
+            return rolling_volatility(self.returns()[:, columns], window)
+        raise ValueError(f"Unsupported target: {target}")
+
+    def _per_ticker(self, kind, window, params, compute):
+        """Assemble per-ticker results, computing the uncached columns in one vectorized call.
+
+        compute(columns) returns an array whose last axis follows columns.
+        """
+        keys = [
+            (kind, ticker, window, params, fingerprint)
+            for ticker, fingerprint in zip(self.panel.tickers, self.panel.fingerprints())
+        ]
+        results = [self.cache.get(key) for key in keys]
+        missing = [column for column, result in enumerate(results) if result is None]
+        if missing:
+            computed = compute(np.array(missing))
+            for i, column in enumerate(missing):
+                results[column] = np.ascontiguousarray(computed[..., i])
+                self.cache.set(keys[column], results[column], self.ttl)
+        return np.stack(results, axis=-1)
+
+    def volatility(self, window=20):
+        """Annualized rolling realized volatility as a (date x ticker) DataFrame."""
+        values = self._per_ticker(
+            'volatility', window, (),
+            lambda columns: rolling_volatility(self.returns()[:, columns], window)
+        )
+        return pd.DataFrame(values, index=self.panel.dates, columns=self.panel.tickers)
+
+    def cross_correlation(self, target='return', max_lag=5, window=20):
+        """Correlation of sentiment on day t with the target on day t + lag, per ticker.
+
+        target is 'return' (daily log return) or 'volatility' (rolling
+        realized volatility over window). Rows are lags 0..max_lag.
+        """
+        lags = list(range(max_lag + 1))
+        values = self._per_ticker(
+            'cross_correlation', window, (target, max_lag),
+            lambda columns: lagged_correlations(
+                self.panel.sentiment[:, columns], self._target(target, window, columns), lags
+            )
+        )
+        return pd.DataFrame(values, index=pd.Index(lags, name='lag'), columns=self.panel.tickers)
+
+    def regression(self, target='return', lag=1, window=20):
+        """Per-ticker OLS of the target on day t + lag against sentiment on day t."""
+        values = self._per_ticker(
+            'regression', window, (target, lag),
+            lambda columns: regression_stats(
+                self.panel.sentiment[:, columns],
+                _shift_forward(self._target(target, window, columns), lag)
+            )
+        )
+        return pd.DataFrame(values.T, index=self.panel.tickers, columns=REGRESSION_STATS)
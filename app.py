@@ -1,22 +1,18 @@
 import streamlit as st
-import yfinance as yf
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
+from contextlib import nullcontext
+import json
 from dotenv import load_dotenv
-import os
 
-# Import custom modules
-from sentiment_analysis import analyze_sentiment
-from data_fetcher import fetch_tweets, fetch_reddit_posts, fetch_news
-from technical_analysis import calculate_technical_indicators
-from database import init_db, save_analysis
+# Import custom modules (the analysis pipeline is imported after login)
+from database import init_db, save_analysis, get_recent_analysis
 from auth import login_required, create_user
 
 # Load environment variables
 load_dotenv()
 
+# Create tables once per server process rather than on every rerun
+st.cache_resource(init_db)()
+
 # Initialize session state
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -85,6 +81,12 @@ with st.sidebar:
 
 # Main content
 if st.session_state.authenticated:
+    # Deferred so the login page renders without loading pandas, nltk or plotly
+    from pipeline import stream_snapshot, invalidate_snapshot
+    from data_fetcher import failure_message
+    from chart_data import build_price_figure
+    from instrumentation import trace, profile, metrics_snapshot
+
     st.title("📈 Advanced Stock Sentiment Dashboard")
 
     # Ticker input
@@ -97,122 +99,178 @@ if st.session_state.authenticated:
             ['1D', '1W', '1M', '3M', '1Y', '5Y']
         )
 
-    if st.button('Analyze'):
-        with st.spinner('Fetching and analyzing data...'):
-            # Fetch stock data
-            stock = yf.Ticker(ticker)
-            
-            # Get historical data
-            period_map = {
-                '1D': '1d', '1W': '5d', '1M': '1mo',
-                '3M': '3mo', '1Y': '1y', '5Y': '5y'
-            }
-            hist = stock.history(period=period_map[timeframe])
-            
-            # Technical Analysis
-            indicators = calculate_technical_indicators(hist)
-            
-            # Create price chart
-            fig = go.Figure()
-            fig.add_trace(go.Candlestick(
-                x=hist.index,
-                open=hist['Open'],
-                high=hist['High'],
-                low=hist['Low'],
-                close=hist['Close'],
-                name='Price'
-            ))
-            
-            # Add moving averages
-            fig.add_trace(go.Scatter(
-                x=hist.index,
-                y=indicators['SMA_20'],
-                name='20-day SMA',
-                line=dict(color='blue')
-            ))
-            
-            fig.update_layout(
-                title=f'{ticker} Stock Price',
-                yaxis_title='Price',
-                xaxis_title='Date',
-                template='plotly_dark' if theme == 'Dark' else 'plotly_white'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Technical Indicators
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("RSI", f"{indicators['RSI'][-1]:.2f}")
-            with col2:
-                st.metric("MACD", f"{indicators['MACD'][-1]:.2f}")
-            with col3:
-                st.metric("Volume", f"{hist['Volume'][-1]:,.0f}")
-            
-            # Sentiment Analysis
-            st.subheader("Sentiment Analysis")
-            
-            # Fetch and analyze data from different sources
-            tweets = fetch_tweets(ticker)
-            reddit_posts = fetch_reddit_posts(ticker)
-            news = fetch_news(ticker)
-            
-            # Calculate sentiment scores
-            tweet_sentiment = analyze_sentiment(tweets)
-            reddit_sentiment = analyze_sentiment(reddit_posts)
-            news_sentiment = analyze_sentiment(news)
-            
-            # Display sentiment scores
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Twitter Sentiment", f"{tweet_sentiment:.2f}")
-            with col2:
-                st.metric("Reddit Sentiment", f"{reddit_sentiment:.2f}")
-            with col3:
-                st.metric("News Sentiment", f"{news_sentiment:.2f}")
-            
-            # Display recent social media posts
-            st.subheader("Recent Social Media Posts")
-            tab1, tab2, tab3 = st.tabs(["Twitter", "Reddit", "News"])
-            
-            with tab1:
-                for tweet in tweets[:5]:
-                    st.markdown(f"- {tweet}")
-            
-            with tab2:
-                for post in reddit_posts[:5]:
-                    st.markdown(f"- {post}")
-            
-            with tab3:
-                for article in news[:5]:
-                    st.markdown(f"- {article}")
-            
-            # Company Information
-            st.subheader("Company Information")
-            info = stock.info
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write("**Company Profile**")
-                st.write(f"Name: {info.get('longName', 'N/A')}")
-                st.write(f"Sector: {info.get('sector', 'N/A')}")
-                st.write(f"Industry: {info.get('industry', 'N/A')}")
-                st.write(f"Market Cap: ${info.get('marketCap', 0):,.2f}")
-            
-            with col2:
-                st.write("**Key Statistics**")
-                st.write(f"P/E Ratio: {info.get('trailingPE', 'N/A')}")
-                st.write(f"EPS: {info.get('trailingEps', 'N/A')}")
-                st.write(f"Dividend Yield: {info.get('dividendYield', 0)*100:.2f}%")
-                st.write(f"52 Week High: ${info.get('fiftyTwoWeekHigh', 0):.2f}")
-            
-            # Save analysis to database
-            save_analysis(ticker, {
-                'price': hist['Close'][-1],
-                'sentiment': (tweet_sentiment + reddit_sentiment + news_sentiment) / 3,
-                'volume': hist['Volume'][-1],
-                'timestamp': datetime.now()
-            })
+    # Latest result saved by the watchlist worker (or an earlier run), shown without fetching
+    latest = get_recent_analysis(ticker.upper(), limit=1)
+    if latest:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Last Price", f"${latest[0].price:,.2f}")
+        with col2:
+            st.metric("Overall Sentiment", f"{latest[0].sentiment:.2f}")
+        with col3:
+            st.metric("Last Refreshed", latest[0].timestamp.strftime('%Y-%m-%d %H:%M'))
+
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        analyze = st.button('Analyze')
+    with col2:
+        refresh = st.button('Refresh data')
+    with col3:
+        profile_run = st.checkbox('Profile run', help="Capture a cProfile of the next Analyze/Refresh; see Diagnostics")
+    if refresh:
+        # Explicit invalidation: drop the cached snapshot and fetched posts
+        invalidate_snapshot(ticker)
+    if analyze or refresh:
+        st.session_state.analysis_key = (ticker.upper(), timeframe)
+
+    # Analyze/Refresh streams a snapshot in (shared across sessions until its
+    # TTL expires): each section fills its placeholder as soon as its stage
+    # finishes. Other reruns (theme toggles, watchlist edits) replay the
+    # session's snapshot, however old, and never fetch.
+    analysis_key = st.session_state.get('analysis_key')
+    if analysis_key:
+        analysis_ticker, analysis_timeframe = analysis_key
+        chart_slot = st.empty()
+        chart_slot.info('Loading price history...')
+        caption_slot = st.empty()
+
+        # Technical Indicators
+        col1, col2, col3 = st.columns(3)
+        rsi_slot, macd_slot, volume_slot = col1.empty(), col2.empty(), col3.empty()
+
+        # Sentiment Analysis
+        st.subheader("Sentiment Analysis")
+        timed_out_slot = st.empty()
+        source_labels = {'twitter': "Twitter Sentiment", 'reddit': "Reddit Sentiment", 'news': "News Sentiment"}
+        sentiment_slots = {}
+        for column, (source, label) in zip(st.columns(3), source_labels.items()):
+            sentiment_slots[source] = column.empty()
+            sentiment_slots[source].metric(label, "...")
+
+        # Display recent social media posts
+        st.subheader("Recent Social Media Posts")
+        tab1, tab2, tab3 = st.tabs(["Twitter", "Reddit", "News"])
+        post_slots = {'twitter': tab1.empty(), 'reddit': tab2.empty(), 'news': tab3.empty()}
+
+        # Company Information
+        st.subheader("Company Information")
+        col1, col2 = st.columns(2)
+        profile_slot, statistics_slot = col1.empty(), col2.empty()
+        profile_slot.caption('Loading company information...')
+
+        timed_out = []
+        snapshot = st.session_state.get('snapshot')
+        run = analyze or refresh or snapshot is None or (snapshot.ticker, snapshot.timeframe) != analysis_key
+        # Every run is traced for the Diagnostics panel; profiling is opt-in
+        run_profiler = profile(f"analysis-{analysis_ticker}") if profile_run and run else nullcontext()
+        events = stream_snapshot(analysis_ticker, analysis_timeframe) if run else snapshot.events()
+        with trace() as run_trace, run_profiler as run_profile:
+            try:
+                for stage, value in events:
+                    if stage == 'history':
+                        hist = value
+                        volume_slot.metric("Volume", f"{hist['Volume'].iloc[-1]:,.0f}")
+                    elif stage == 'indicators':
+                        indicators = value
+
+                        # Create price chart, downsampled so long histories stay light in the browser
+                        fig = build_price_figure(
+                            hist,
+                            overlays={'20-day SMA': (indicators['SMA_20'], dict(color='blue'))},
+                            title=f'{analysis_ticker} Stock Price',
+                            template='plotly_dark' if theme == 'Dark' else 'plotly_white'
+                        )
+
+                        chart_slot.plotly_chart(fig, use_container_width=True)
+                        rsi_slot.metric("RSI", f"{indicators['RSI'].iloc[-1]:.2f}")
+                        macd_slot.metric("MACD", f"{indicators['MACD'].iloc[-1]:.2f}")
+                    elif stage == 'sentiment':
+                        source = value['source']
+                        if value['failure']:
+                            # Left out of the overall sentiment rather than scored as 0
+                            sentiment_slots[source].metric(source_labels[source], "n/a")
+                            post_slots[source].warning(failure_message(source, value['failure']))
+                        else:
+                            sentiment_slots[source].metric(source_labels[source], f"{value['score']:.2f}")
+                            post_slots[source].markdown("\n".join(f"- {post}" for post in value['posts'][:5]))
+                        if value['timed_out']:
+                            timed_out.append(source)
+                            timed_out_slot.info(f"Showing partial results; timed out waiting for: {', '.join(timed_out)}")
+                    elif stage == 'info':
+                        info = value
+                        with profile_slot.container():
+                            st.write("**Company Profile**")
+                            st.write(f"Name: {info.get('longName', 'N/A')}")
+                            st.write(f"Sector: {info.get('sector', 'N/A')}")
+                            st.write(f"Industry: {info.get('industry', 'N/A')}")
+                            st.write(f"Market Cap: ${info.get('marketCap', 0):,.2f}")
+                        with statistics_slot.container():
+                            st.write("**Key Statistics**")
+                            st.write(f"P/E Ratio: {info.get('trailingPE', 'N/A')}")
+                            st.write(f"EPS: {info.get('trailingEps', 'N/A')}")
+                            st.write(f"Dividend Yield: {info.get('dividendYield', 0)*100:.2f}%")
+                            st.write(f"52 Week High: ${info.get('fiftyTwoWeekHigh', 0):.2f}")
+                    elif stage == 'snapshot':
+                        snapshot = value
+                        caption_slot.caption(f"Data as of {snapshot.created_at:%Y-%m-%d %H:%M:%S}")
+            except Exception as e:
+                # Keep the failure from re-running on every UI rerun; only Analyze/Refresh retries
+                print(f"Error analyzing {analysis_ticker}: {e}")
+                chart_slot.error(f"Could not analyze {analysis_ticker}: {e}")
+                st.session_state.pop('analysis_key', None)
+                snapshot = None
+
+        if run:
+            st.session_state.snapshot = snapshot
+            st.session_state.last_trace = run_trace
+        if run_profile is not None:
+            st.session_state.last_profile = run_profile
+
+        # Save each snapshot once: a cached one may already be stored by this
+        # session, another session or the watchlist worker
+        saved_at = st.session_state.get('saved_at', {}).get(analysis_key)
+        if latest and analysis_ticker == ticker.upper():
+            saved_at = max(filter(None, (saved_at, latest[0].timestamp)))
+        if snapshot is not None and run and (saved_at is None or snapshot.created_at > saved_at):
+            save_analysis(snapshot.ticker, snapshot.analysis())
+            st.session_state.setdefault('saved_at', {})[analysis_key] = snapshot.created_at
+
+    # Where the time went: the last run's stages, process-wide timings and cache stats
+    with st.expander("Diagnostics"):
+        import pandas as pd
+        last_trace = st.session_state.get('last_trace')
+        if last_trace is not None:
+            st.write(f"**Last run:** {last_trace.seconds * 1000:,.0f} ms")
+            if last_trace.spans:
+                spans = pd.DataFrame(last_trace.spans).sort_values('start')
+                spans[['start', 'seconds']] = spans[['start', 'seconds']] * 1000
+                st.dataframe(spans.rename(columns={'start': 'start (ms)', 'seconds': 'duration (ms)'}),
+                             use_container_width=True)
+                st.bar_chart(pd.Series(last_trace.totals(), name='seconds'))
+            else:
+                st.caption("Served from the snapshot cache; nothing was recomputed.")
+            if last_trace.counters:
+                st.json(last_trace.counters)
+
+        metrics = metrics_snapshot()
+        st.write("**Since server start**")
+        if metrics['spans']:
+            st.dataframe(pd.DataFrame(metrics['spans']).T, use_container_width=True)
+        st.write("**Caches and database writer**")
+        st.json(metrics['stats'])
+        st.download_button(
+            "Download metrics (JSON)",
+            json.dumps(metrics, indent=2, default=str),
+            file_name='metrics.json',
+            mime='application/json'
+        )
+
+        last_profile = st.session_state.get('last_profile')
+        if last_profile is not None:
+            st.write("**Profile of the last profiled run** (main thread)")
+            if last_profile.path:
+                st.caption(f"Saved to {last_profile.path}")
+            st.code(last_profile.text)
 else:
     st.warning("Please login to access the dashboard.")
 
@@ -0,0 +1,102 @@
+import asyncio
+import os
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from database import (
+    DATABASE_URL, StockAnalysis, Watchlist,
+    _analysis_row, _create_schema, _engine_options, _sentiment_item_rows, _set_sqlite_pragmas,
+    _write_analyses, flush_analyses
+)
+
+# Async drivers for the sync URLs database.py accepts
+_ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql'
+}
+
+def _async_url(url):
+    """Swap a sync database URL's driver for its asyncio counterpart."""
+    scheme, rest = url.split('://', 1)
+    backend = scheme.split('+', 1)[0]
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {scheme} URLs; set ASYNC_DATABASE_URL.")
+    return f"{_ASYNC_DRIVERS[backend]}://{rest}"
+
+# Same database and models as database.py, reached through an asyncio driver
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL') or _async_url(DATABASE_URL)
+try:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+except ModuleNotFoundError as e:
+    # asyncpg and aiomysql are optional extras (see requirements.txt)
+    raise ModuleNotFoundError(
+        f"{ASYNC_DATABASE_URL.split('://', 1)[0]} URLs need the {e.name} package; pip install {e.name}",
+        name=e.name
+    ) from e
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+if async_engine.dialect.name == 'sqlite':
+    event.listen(async_engine.sync_engine, 'connect', _set_sqlite_pragmas)
+
+async def init_db():
+    async with async_engine.begin() as connection:
+        await connection.run_sync(_create_schema)
+
+async def dispose():
+    """Close pooled connections, e.g. before the event loop shuts down."""
+    await async_engine.dispose()
+
+async def save_analyses(items):
+    """Insert many (ticker, data) analysis results in one transaction."""
+    items = list(items)
+    rows = [_analysis_row(ticker, data) for ticker, data in items]
+    if not rows:
+        return
+    sentiment_items = [
+        item
+        for (ticker, data), row in zip(items, rows)
+        for item in _sentiment_item_rows(ticker, data, row['timestamp'])
+    ]
+    try:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(_write_analyses, rows, sentiment_items)
+    except Exception as e:
+        print(f"Error saving analysis: {e}")
+
+async def save_analysis(ticker, data):
+    """Save stock analysis data to database."""
+    await save_analyses([(ticker, data)])
+
+async def get_recent_analysis(ticker, limit=10):
+    """Get recent analysis data for a ticker."""
+    # Include rows still queued by the sync writer
+    await asyncio.to_thread(flush_analyses)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(StockAnalysis)
+            .where(StockAnalysis.ticker == ticker.upper())
+            .order_by(StockAnalysis.timestamp.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+async def add_to_watchlist(user_id, ticker):
+    """Add a ticker to user's watchlist."""
+    async with AsyncSessionLocal() as db:
+        try:
+            db.add(Watchlist(user_id=user_id, ticker=ticker))
+            await db.commit()
+        except Exception as e:
+            print(f"Error adding to watchlist: {e}")
+            await db.rollback()
+
+async def get_watchlist(user_id):
+    """Get user's watchlist."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Watchlist)
+            .where(Watchlist.user_id == user_id)
+            .order_by(Watchlist.added_at.desc())
+        )
+        return result.scalars().all()
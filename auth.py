@@ -1,5 +1,3 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 import os
@@ -14,16 +12,31 @@ SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
 ALGORITHM = os.getenv('ALGORITHM', 'HS256')
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context, built on first use so importing this module
+# (e.g. to render the login page) does not load passlib and bcrypt
+_pwd_context = None
+
+def get_password_context():
+    """Return the shared passlib CryptContext, creating it on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+def __getattr__(name):
+    # Keep the old module-level auth.pwd_context working, still built lazily
+    if name == 'pwd_context':
+        return get_password_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def verify_password(plain_password, hashed_password):
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
@@ -33,6 +46,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -0,0 +1,213 @@
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+from technical_analysis import INDICATOR_NAMES, INDICATORS, INPUT_SERIES, calculate_indicator_block, _parse_indicator
+
+# One raw little-endian file per field; timestamps are UTC nanoseconds
+ARCHIVE_FIELDS = {
+    'ts': '<i8',
+    'Open': '<f8',
+    'High': '<f8',
+    'Low': '<f8',
+    'Close': '<f8',
+    'Volume': '<f8'
+}
+
+INDEX_FILE = 'index.json'
+
+def _field_path(path, field):
+    return os.path.join(path, f"{field}.bin")
+
+def _ema_settle_bars(span):
+    # An EMA forgets its starting value as (1 - 2 / (span + 1)) ** bars; after
+    # this many bars the difference is below double precision
+    return math.ceil(math.log(2.0 ** -53) / math.log1p(-2.0 / (span + 1)))
+
+def required_warmup(names=None):
+    """Bars to replay before a scan chunk so every named indicator matches a full-history pass.
+
+    Rolling windows need window + 1 bars (changes and true ranges read the
+    previous bar); EMAs, including those behind MACD, need enough bars for
+    their start value to decay away.
+    """
+    def lookback(name):
+        family, values = _parse_indicator(name)
+        if family in INPUT_SERIES:
+            return 0
+        spec = INDICATORS[family]
+        params = dict(zip((param for param, _ in spec.params), values))
+        bars = 0
+        if 'window' in params:
+            bars = int(math.ceil(params['window'])) + 1
+        if 'span' in params:
+            bars = max(bars, _ema_settle_bars(params['span']))
+        return max([bars] + [lookback(dep) for dep in spec.depends(**params)])
+    return max([0] + [lookback(name) for name in (INDICATOR_NAMES if names is None else names)])
+
+def _utc_nanos(value):
+    """A timestamp bound as UTC nanoseconds; naive values are taken to be UTC."""
+    value = pd.Timestamp(value)
+    value = value.tz_localize('UTC') if value.tz is None else value.tz_convert('UTC')
+    return value.as_unit('ns').value
+
+class BarArchiveWriter:
+    """Appends bars to a columnar archive, one contiguous run per ticker.
+
+    A ticker's bars may be appended in several chunks as long as no other
+    ticker is written in between, so histories larger than memory can be
+    streamed in. Bars must arrive in time order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {'fields': ARCHIVE_FIELDS, 'rows': 0, 'tickers': {}}
+        self._files = {}
+        for field, dtype in ARCHIVE_FIELDS.items():
+            f = open(_field_path(path, field), 'ab')
+            # Drop bytes a writer that died before close() appended past the committed index
+            committed = self.index['rows'] * np.dtype(dtype).itemsize
+            if f.seek(0, os.SEEK_END) < committed:
+                f.close()
+                self._close_files()
+                raise ValueError(f"{_field_path(path, field)} is shorter than the archive index.")
+            f.truncate(committed)
+            self._files[field] = f
+        self._last_ticker = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, ticker, df):
+        """Append an OHLCV DataFrame with a DatetimeIndex for one ticker."""
+        if len(df) == 0:
+            return
+        tickers = self.index['tickers']
+        if ticker in tickers and ticker != self._last_ticker:
+            raise ValueError(f"{ticker} is already in the archive; write each ticker in one run.")
+
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        timestamps = index.tz_convert('UTC').as_unit('ns').asi8
+        if not np.all(np.diff(timestamps) > 0):
+            raise ValueError("Bars must be in strictly increasing time order.")
+        if ticker in tickers and timestamps[0] <= self._last_timestamp:
+            raise ValueError("Bars must be in strictly increasing time order.")
+
+        self._files['ts'].write(np.ascontiguousarray(timestamps, dtype=ARCHIVE_FIELDS['ts']).tobytes())
+        for field in ('Open', 'High', 'Low', 'Close', 'Volume'):
+            values = np.ascontiguousarray(df[field].to_numpy(), dtype=ARCHIVE_FIELDS[field])
+            self._files[field].write(values.tobytes())
+
+        offset, length = tickers.get(ticker, (self.index['rows'], 0))
+        tickers[ticker] = (offset, length + len(df))
+        self.index['rows'] += len(df)
+        self._last_ticker = ticker
+        self._last_timestamp = timestamps[-1]
+
+    def _close_files(self):
+        for f in self._files.values():
+            f.close()
+
+    def close(self):
+        """Flush the field files and write the ticker index."""
+        self._close_files()
+        index_path = os.path.join(self.path, INDEX_FILE)
+        with open(index_path + '.tmp', 'w') as f:
+            json.dump(self.index, f)
+        os.replace(index_path + '.tmp', index_path)
+
+class BarArchive:
+    """Read-only, memory-mapped view of a bar archive.
+
+    Field arrays are np.memmap objects, so slicing a ticker's range returns
+    zero-copy views backed by the page cache instead of loading the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        rows = self.index['rows']
+        self.columns = {
+            field: np.memmap(_field_path(path, field), dtype=dtype, mode='r', shape=(rows,))
+            if rows else np.empty(0, dtype=dtype)
+            for field, dtype in self.index['fields'].items()
+        }
+
+    def tickers(self):
+        """Tickers stored in the archive."""
+        return list(self.index['tickers'])
+
+    def _bounds(self, ticker, start=None, end=None):
+        if ticker not in self.index['tickers']:
+            raise KeyError(ticker)
+        offset, length = self.index['tickers'][ticker]
+        lo, hi = offset, offset + length
+        ts = self.columns['ts'][lo:hi]
+        if start is not None:
+            lo = offset + int(np.searchsorted(ts, _utc_nanos(start), side='left'))
+        if end is not None:
+            hi = offset + int(np.searchsorted(ts, _utc_nanos(end), side='right'))
+        return lo, hi
+
+    def bars(self, ticker, start=None, end=None):
+        """Zero-copy views of every field for a ticker, optionally bounded by time."""
+        lo, hi = self._bounds(ticker, start, end)
+        return {field: column[lo:hi] for field, column in self.columns.items()}
+
+    def frame(self, ticker, start=None, end=None):
+        """Copy a ticker's bars into a pandas DataFrame (for small ranges)."""
+        bars = self.bars(ticker, start, end)
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(bars.pop('ts')), utc=True), name='Date')
+        return pd.DataFrame({field: np.asarray(values) for field, values in bars.items()}, index=index)
+
+    def indicators(self, ticker, names=None, start=None, end=None):
+        """Indicator block (see calculate_indicator_block) over a ticker's bars."""
+        bars = self.bars(ticker, start, end)
+        return calculate_indicator_block(bars['Close'], bars['High'], bars['Low'], bars['Volume'], names)
+
+    def scan_indicators(self, ticker, names=None, chunk_bars=1_000_000, warmup=None):
+        """Yield (timestamps, block) pairs covering a ticker's whole history.
+
+        Each chunk is computed over zero-copy slices of the archive, with
+        ``warmup`` preceding bars replayed and dropped so results match a
+        single pass over the full history; only one chunk's output is held
+        in memory at a time. warmup defaults to required_warmup(names), and
+        a smaller value is rejected because those chunks would be wrong.
+        """
+        names = list(INDICATOR_NAMES if names is None else names)
+        needed = required_warmup(names)
+        if warmup is None:
+            warmup = needed
+        elif warmup < needed:
+            raise ValueError(f"warmup={warmup} is too short for {names}; at least {needed} bars are needed.")
+        lo, hi = self._bounds(ticker)
+        for start in range(lo, hi, chunk_bars):
+            stop = min(start + chunk_bars, hi)
+            first = max(lo, start - warmup)
+            block = calculate_indicator_block(
+                self.columns['Close'][first:stop],
+                self.columns['High'][first:stop],
+                self.columns['Low'][first:stop],
+                self.columns['Volume'][first:stop],
+                names
+            )
+            yield self.columns['ts'][start:stop], block[:, start - first:]
+
+def write_archive(path, frames):
+    """Write a dict of ticker -> OHLCV DataFrame to an archive at path."""
+    with BarArchiveWriter(path) as writer:
+        for ticker, df in frames.items():
+            writer.append(ticker, df)
@@ -0,0 +1,114 @@
+"""Benchmark saving and reading analyses at scale.
+
+Runs against a throwaway SQLite database unless --database-url names
+another (it must be empty or disposable). For each scale, rows spread over
+--tickers tickers are written through save_analysis() one at a time and
+through one save_analyses() call, each followed by flush_analyses(); then
+get_recent_analysis() and a 30-day get_analysis_history() are timed
+against the grown tables.
+
+    python benchmarks/bench_database.py [--rows 1000 10000] [--items 20] [--json out.json]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from fixtures import synthetic_corpus, measure, write_results
+
+def analyses(prefix, rows, tickers, items, corpus, now):
+    """rows (ticker, data) pairs one minute apart, each with items scored posts."""
+    pairs = []
+    for i in range(rows):
+        posts = [
+            {'source': 'twitter', 'text': corpus[(i * items + j) % len(corpus)],
+             'vader': 0.1, 'textblob': 0.05, 'score': 0.085}
+            for j in range(items)
+        ]
+        pairs.append((f"{prefix}{i % tickers:03d}", {
+            'price': 100.0 + i % 50,
+            'sentiment': ((i * 37) % 200 - 100) / 100.0,
+            'volume': 1_000_000 + i,
+            'timestamp': now - timedelta(minutes=rows - i),
+            'sentiment_items': posts
+        }))
+    return pairs
+
+def run(rows_list, tickers=20, items=20, repeat=20):
+    from database import (init_db, save_analysis, save_analyses, flush_analyses,
+                          get_recent_analysis, get_analysis_history)
+    init_db()
+    corpus = synthetic_corpus(50_000, duplicate_ratio=0.0)
+    now = datetime.now()
+    total = 0
+    results = []
+    for scale, rows in enumerate(rows_list):
+        one_by_one = analyses(f"S{scale}A", rows, tickers, items, corpus, now)
+        batched = analyses(f"S{scale}B", rows, tickers, items, corpus, now)
+
+        def save_each():
+            for ticker, data in one_by_one:
+                save_analysis(ticker, data)
+            flush_analyses()
+
+        def save_batch():
+            save_analyses(batched)
+            flush_analyses()
+
+        for name, func in (('save_analysis', save_each), ('save_analyses', save_batch)):
+            timing = measure(func, repeat=1)
+            total += rows
+            results.append({
+                'case': f"{name}[{rows}]", 'function': name, 'rows': rows, 'items_per_row': items,
+                'rows_per_second': rows / timing['best_seconds'], **timing
+            })
+
+        ticker = f"S{scale}A000"
+        reads = (
+            ('get_recent_analysis', lambda: get_recent_analysis(ticker, limit=10)),
+            ('get_analysis_history_30d', lambda: get_analysis_history(ticker, now - timedelta(days=30), now))
+        )
+        for name, func in reads:
+            results.append({
+                'case': f"{name}[{total}]", 'function': name, 'table_rows': total,
+                **measure(func, repeat)
+            })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10_000])
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--items', type=int, default=20, help="scored posts saved with each analysis")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url', help="disposable database to use instead of a temporary SQLite file")
+    parser.add_argument('--json', help="write machine-readable results to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    # database binds its engine at import, so point it at the scratch database first
+    scratch = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        scratch = tempfile.mkdtemp(prefix='bench-db-')
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+    try:
+        results = run(args.rows, args.tickers, args.items, args.repeat)
+    finally:
+        if scratch:
+            from database import engine, get_analysis_writer
+            get_analysis_writer().close()
+            engine.dispose()
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.json:
+        write_results(args.json, 'database', results)
+    if args.json == '-':
+        return
+    print(f"{'case':<36} {'best ms':>10} {'rows/s':>12}")
+    for row in results:
+        rate = f"{row['rows_per_second']:>12,.0f}" if 'rows_per_second' in row else ''
+        print(f"{row['case']:<36} {row['best_seconds'] * 1e3:>10.2f} {rate}")
+
+if __name__ == '__main__':
+    main()
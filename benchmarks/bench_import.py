@@ -0,0 +1,66 @@
+"""Benchmark cold-start import time of the app's modules.
+
+Each module is imported in a fresh interpreter, so nothing is shared
+through sys.modules, and the best of several runs is reported. Importing
+must not touch the network or load models; those costs belong to first use.
+
+    python benchmarks/bench_import.py [--modules auth pipeline] [--repeat 5] [--json out.json]
+"""
+import argparse
+import subprocess
+import sys
+from fixtures import ROOT, write_results
+
+DEFAULT_MODULES = [
+    'database', 'auth', 'sentiment_analysis', 'data_fetcher',
+    'technical_analysis', 'pipeline', 'chart_data', 'watchlist_worker', 'instrumentation'
+]
+
+_TIMER = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "__import__(sys.argv[1])\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+def import_seconds(module):
+    """Seconds a fresh interpreter spends importing module."""
+    completed = subprocess.run(
+        [sys.executable, '-c', _TIMER, module],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+def run(modules, repeat=5):
+    results = []
+    for module in modules:
+        try:
+            seconds = min(import_seconds(module) for _ in range(repeat))
+            error = None
+        except subprocess.CalledProcessError as e:
+            seconds = None
+            error = e.stderr.strip().splitlines()[-1] if e.stderr.strip() else str(e)
+        results.append({'case': f"import[{module}]", 'module': module, 'seconds': seconds, 'error': error})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help="write machine-readable results to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    results = run(args.modules, args.repeat)
+    if args.json:
+        write_results(args.json, 'import', results)
+    if args.json == '-':
+        return
+    print(f"{'module':<20} {'import ms':>10}")
+    for row in results:
+        if row['error']:
+            print(f"{row['module']:<20} {'failed':>10}  {row['error']}")
+        else:
+            print(f"{row['module']:<20} {row['seconds'] * 1e3:>10.1f}")
+
+if __name__ == '__main__':
+    main()
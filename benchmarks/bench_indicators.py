@@ -0,0 +1,136 @@
+"""Benchmark calculate_technical_indicators against the original pandas version.
+
+Checks that the NumPy block kernels reproduce the original outputs and
+reports wall time and peak traced memory on long synthetic histories,
+then times the dashboard timeframes (1D to 5Y of daily bars) and
+multi-ticker panels of 5Y histories.
+
+    python benchmarks/bench_indicators.py [--bars 1250 100000 1000000] [--tickers 10 100 500] [--json out.json]
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from fixtures import TIMEFRAME_BARS, synthetic_ohlcv, synthetic_panel, write_results
+
+from technical_analysis import calculate_technical_indicators, calculate_panel_indicators, INDICATOR_NAMES
+
+def reference_indicators(df):
+    """The original pandas implementation, kept as the correctness reference."""
+    indicators = {}
+    indicators['SMA_20'] = df['Close'].rolling(window=20).mean()
+    indicators['SMA_50'] = df['Close'].rolling(window=50).mean()
+    indicators['SMA_200'] = df['Close'].rolling(window=200).mean()
+    indicators['EMA_12'] = df['Close'].ewm(span=12, adjust=False).mean()
+    indicators['EMA_26'] = df['Close'].ewm(span=26, adjust=False).mean()
+    indicators['MACD'] = indicators['EMA_12'] - indicators['EMA_26']
+    indicators['MACD_Signal'] = indicators['MACD'].ewm(span=9, adjust=False).mean()
+    indicators['MACD_Hist'] = indicators['MACD'] - indicators['MACD_Signal']
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    indicators['RSI'] = 100 - (100 / (1 + rs))
+    indicators['BB_Middle'] = df['Close'].rolling(window=20).mean()
+    bb_std = df['Close'].rolling(window=20).std()
+    indicators['BB_Upper'] = indicators['BB_Middle'] + (bb_std * 2)
+    indicators['BB_Lower'] = indicators['BB_Middle'] - (bb_std * 2)
+    indicators['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
+    indicators['Volume_Ratio'] = df['Volume'] / indicators['Volume_SMA']
+    high_low = df['High'] - df['Low']
+    high_close = np.abs(df['High'] - df['Close'].shift())
+    low_close = np.abs(df['Low'] - df['Close'].shift())
+    ranges = pd.concat([high_low, high_close, low_close], axis=1)
+    true_range = np.max(ranges, axis=1)
+    indicators['ATR'] = true_range.rolling(14).mean()
+    return indicators
+
+def measure(func, df, repeat):
+    """Best wall time over repeat runs and peak traced memory of one run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(df)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def check(df):
+    """Raise if any indicator differs from the reference beyond rounding."""
+    expected = reference_indicators(df)
+    actual = calculate_technical_indicators(df)
+    for name in INDICATOR_NAMES:
+        a = actual[name].to_numpy()
+        b = expected[name].to_numpy(dtype=np.float64)
+        if not np.allclose(a, b, rtol=1e-7, atol=1e-9, equal_nan=True):
+            worst = np.nanmax(np.abs(a - b))
+            raise AssertionError(f"{name} differs from the reference (max abs diff {worst:g})")
+
+def run_reference(bars_list, repeat=3):
+    results = []
+    for bars in bars_list:
+        df = synthetic_ohlcv(bars)
+        check(df)
+        old_time, old_peak = measure(reference_indicators, df, repeat)
+        new_time, new_peak = measure(calculate_technical_indicators, df, repeat)
+        results.append({
+            'case': f"reference[{bars}]",
+            'bars': bars,
+            'reference_seconds': old_time,
+            'block_seconds': new_time,
+            'reference_peak_bytes': old_peak,
+            'block_peak_bytes': new_peak
+        })
+    return results
+
+def run_timeframes(repeat=20):
+    results = []
+    for timeframe, bars in TIMEFRAME_BARS.items():
+        df = synthetic_ohlcv(bars, freq='B')
+        seconds, peak = measure(calculate_technical_indicators, df, repeat)
+        results.append({'case': f"timeframe[{timeframe}]", 'bars': bars, 'tickers': 1,
+                         'block_seconds': seconds, 'block_peak_bytes': peak})
+    return results
+
+def run_panels(tickers_list, bars=TIMEFRAME_BARS['5Y'], repeat=3):
+    results = []
+    for tickers in tickers_list:
+        panel = synthetic_panel(bars, [f"T{i:04d}" for i in range(tickers)])
+        seconds, peak = measure(calculate_panel_indicators, panel, repeat)
+        results.append({'case': f"panel[{tickers}x{bars}]", 'bars': bars, 'tickers': tickers,
+                        'block_seconds': seconds, 'block_peak_bytes': peak})
+    return results
+
+def run(bars_list, tickers_list, repeat=3):
+    return run_reference(bars_list, repeat) + run_timeframes() + run_panels(tickers_list, repeat=repeat)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, nargs='+', default=[1250, 100_000, 1_000_000])
+    parser.add_argument('--tickers', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help="write machine-readable results to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    results = run(args.bars, args.tickers, args.repeat)
+    if args.json:
+        write_results(args.json, 'indicators', results)
+    if args.json == '-':
+        return
+    print(f"{'bars':>10} {'ref ms':>10} {'block ms':>10} {'ref MiB':>10} {'block MiB':>10}")
+    for row in results:
+        if 'reference_seconds' in row:
+            print(f"{row['bars']:>10} {row['reference_seconds'] * 1e3:>10.2f} {row['block_seconds'] * 1e3:>10.2f} "
+                  f"{row['reference_peak_bytes'] / 2**20:>10.1f} {row['block_peak_bytes'] / 2**20:>10.1f}")
+    print()
+    print(f"{'case':<24} {'block ms':>10} {'block MiB':>10}")
+    for row in results:
+        if 'reference_seconds' not in row:
+            print(f"{row['case']:<24} {row['block_seconds'] * 1e3:>10.2f} {row['block_peak_bytes'] / 2**20:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark the end-to-end analysis pipeline offline.
+
+Runs iter_analysis() with stub Twitter/Reddit/NewsAPI clients serving a
+synthetic corpus and a PriceStore backed by a temporary SQLite file and
+a synthetic price provider. Each timeframe is measured cold (empty price
+store, fetch cache and score cache) and warm (everything cached), and
+reports the time to the first chart ('history' event) besides the total.
+--latency adds a simulated network round trip to every stub call.
+
+    python benchmarks/bench_pipeline.py [--timeframes 1M 5Y] [--latency 0.05] [--json out.json]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from fixtures import TIMEFRAME_BARS, StubPriceProvider, stub_clients, synthetic_corpus, write_results
+
+# Cold runs clear the engine's score cache; keep it in memory so a
+# configured on-disk cache is never wiped
+os.environ['SENTIMENT_CACHE_PATH'] = ''
+
+from data_fetcher import invalidate_fetch_cache
+from pipeline import iter_analysis
+from price_store import PriceStore
+from sentiment_analysis import get_engine
+
+def timed_run(ticker, timeframe, clients, store):
+    """Seconds until the 'history' event and until the final snapshot."""
+    start = time.perf_counter()
+    first_chart = None
+    for stage, _ in iter_analysis(ticker, timeframe, include_info=False, clients=clients, store=store):
+        if stage == 'history' and first_chart is None:
+            first_chart = time.perf_counter() - start
+    return first_chart, time.perf_counter() - start
+
+def run(timeframes, repeat=3, latency=0.0, corpus_size=300, ticker='AAPL'):
+    clients = stub_clients(synthetic_corpus(corpus_size), latency)
+    provider = StubPriceProvider(latency=latency)
+    engine = get_engine()
+    scratch = tempfile.mkdtemp(prefix='bench-pipeline-')
+    results = []
+    try:
+        warm_store = PriceStore(os.path.join(scratch, 'warm.db'), provider, refresh_seconds=86400)
+        for timeframe in timeframes:
+            for mode in ('cold', 'warm'):
+                runs = []
+                for i in range(repeat):
+                    if mode == 'cold':
+                        invalidate_fetch_cache()
+                        if engine.cache is not None:
+                            engine.cache.clear()
+                        store = PriceStore(os.path.join(scratch, f"cold-{timeframe}-{i}.db"), provider)
+                    else:
+                        store = warm_store
+                        # The first warm run fills the caches and is not counted
+                        if i == 0:
+                            timed_run(ticker, timeframe, clients, store)
+                    runs.append(timed_run(ticker, timeframe, clients, store))
+                first_charts, totals = zip(*runs)
+                results.append({
+                    'case': f"pipeline_{mode}[{timeframe}]",
+                    'timeframe': timeframe,
+                    'mode': mode,
+                    'bars': TIMEFRAME_BARS[timeframe],
+                    'posts_per_source': corpus_size,
+                    'latency_seconds': latency,
+                    'best_seconds': min(totals),
+                    'first_chart_seconds': min(first_charts),
+                    'repeat': repeat
+                })
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--timeframes', nargs='+', default=list(TIMEFRAME_BARS), choices=list(TIMEFRAME_BARS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds each stub API call sleeps")
+    parser.add_argument('--posts', type=int, default=300, help="size of the corpus the stub clients serve")
+    parser.add_argument('--json', help="write machine-readable results to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    results = run(args.timeframes, args.repeat, args.latency, args.posts)
+    if args.json:
+        write_results(args.json, 'pipeline', results)
+    if args.json == '-':
+        return
+    print(f"{'case':<24} {'first chart ms':>15} {'total ms':>10}")
+    for row in results:
+        print(f"{row['case']:<24} {row['first_chart_seconds'] * 1e3:>15.2f} {row['best_seconds'] * 1e3:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark text cleaning and sentiment scoring at several corpus sizes.
+
+clean_text runs over every post with its memo cleared (cold) and filled
+(memo); analyze_sentiment is measured cold (the clean_text memo and the
+shared engine's score cache cleared before each run, so every distinct
+text is cleaned and scored) and warm (every text already cached), and
+get_sentiment_breakdown warm. The corpus is synthetic unless --corpus
+points at a recorded one.
+
+    python benchmarks/bench_sentiment.py [--sizes 100 1000 10000] [--corpus posts.json] [--json out.json]
+"""
+import argparse
+import os
+from fixtures import synthetic_corpus, load_corpus, measure, write_results
+
+# Cold runs clear the engine's score cache; keep it in memory so a
+# configured on-disk cache is never wiped
+os.environ['SENTIMENT_CACHE_PATH'] = ''
+
+from sentiment_analysis import clean_text, analyze_sentiment, get_sentiment_breakdown, get_engine
+
+def corpus_of(size, recorded=None):
+    """size posts, cycling through a recorded corpus when one is given."""
+    if not recorded:
+        return synthetic_corpus(size)
+    return [recorded[i % len(recorded)] for i in range(size)]
+
+def run(sizes, repeat=3, recorded=None):
+    engine = get_engine()
+
+    def clear_caches():
+        clean_text.cache_clear()
+        if engine.cache is not None:
+            engine.cache.clear()
+    results = []
+    for size in sizes:
+        texts = corpus_of(size, recorded)
+        distinct = len(set(texts))
+        cases = [
+            ('clean_text', lambda: [clean_text(text) for text in texts], clean_text.cache_clear),
+            ('clean_text_memo', lambda: [clean_text(text) for text in texts], None),
+            ('analyze_sentiment_cold', lambda: analyze_sentiment(texts), clear_caches),
+            ('analyze_sentiment_warm', lambda: analyze_sentiment(texts), None),
+            ('get_sentiment_breakdown_warm', lambda: get_sentiment_breakdown(texts), None)
+        ]
+        for name, func, setup in cases:
+            timing = measure(func, repeat, setup)
+            results.append({
+                'case': f"{name}[{size}]",
+                'function': name,
+                'texts': size,
+                'distinct_texts': distinct,
+                'texts_per_second': size / timing['best_seconds'] if timing['best_seconds'] else None,
+                **timing
+            })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--corpus', help="recorded posts: a JSON list of strings or one post per line")
+    parser.add_argument('--json', help="write machine-readable results to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    recorded = load_corpus(args.corpus) if args.corpus else None
+    results = run(args.sizes, args.repeat, recorded)
+    if args.json:
+        write_results(args.json, 'sentiment', results)
+    if args.json != '-':
+        print(f"{'case':<40} {'best ms':>10} {'texts/s':>12}")
+        for row in results:
+            print(f"{row['case']:<40} {row['best_seconds'] * 1e3:>10.2f} {row['texts_per_second']:>12,.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""Offline fixtures shared by the benchmarks.
+
+Synthetic post corpora and OHLCV histories are generated from a seed, so
+every run measures the same inputs, and the stub API clients and price
+provider stand in for Twitter, Reddit, NewsAPI and yfinance without
+credentials or network access. A recorded corpus (a JSON list of strings
+or a text file with one post per line) can replace the synthetic one.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Daily bars the dashboard timeframes cover
+TIMEFRAME_BARS = {'1D': 1, '1W': 5, '1M': 21, '3M': 63, '1Y': 252, '5Y': 1260}
+
+_TICKERS = ['AAPL', 'MSFT', 'TSLA', 'NVDA', 'AMZN', 'GME', 'AMD', 'META']
+
+_OPENINGS = [
+    "${ticker} is", "Just bought more ${ticker}, it's", "Honestly ${ticker} looks",
+    "Analysts say {ticker} is", "RT @trader{n}: ${ticker}", "{ticker} earnings were",
+    "Why is nobody talking about how ${ticker} is", "Breaking: {ticker} shares are"
+]
+
+_POSITIVE = [
+    "going to the moon 🚀🚀", "a great buy at these levels", "crushing expectations",
+    "super bullish, strong guidance", "up {n}% today, love it", "an excellent long-term hold"
+]
+
+_NEGATIVE = [
+    "a terrible investment", "crashing hard, down {n}%", "overvalued and weak",
+    "disappointing, I'm selling", "a bubble waiting to pop 📉", "losing market share fast"
+]
+
+_NEUTRAL = [
+    "trading sideways", "reporting on {date}", "flat ahead of the Fed meeting",
+    "holding the {n}-day average", "in the news again", "moving with the sector"
+]
+
+_CLOSINGS = [
+    "", "", " https://t.co/{code}", " www.example.com/{ticker}/{n}", " #stocks #investing",
+    " - r/wallstreetbets", " - Reuters", " (not financial advice)", " $$$ {n}!!!"
+]
+
+def synthetic_corpus(size, seed=0, duplicate_ratio=0.2):
+    """size social-media style posts mixing sentiment, URLs, numbers, emoji and cashtags.
+
+    About duplicate_ratio of the posts repeat an earlier one, as retweets
+    and cross-posted headlines do in real fetches.
+    """
+    rng = np.random.default_rng(seed)
+    posts = []
+    for i in range(size):
+        if posts and rng.random() < duplicate_ratio:
+            posts.append(posts[int(rng.integers(len(posts)))])
+            continue
+        tone = rng.choice([_POSITIVE, _NEGATIVE, _NEUTRAL])
+        fields = {
+            'ticker': _TICKERS[int(rng.integers(len(_TICKERS)))],
+            'n': int(rng.integers(1, 200)),
+            'code': f"{int(rng.integers(16 ** 8)):08x}",
+            'date': f"2024-{int(rng.integers(1, 13)):02d}-{int(rng.integers(1, 29)):02d}"
+        }
+        template = (
+            _OPENINGS[int(rng.integers(len(_OPENINGS)))] + ' '
+            + tone[int(rng.integers(len(tone)))]
+            + _CLOSINGS[int(rng.integers(len(_CLOSINGS)))]
+        )
+        posts.append(template.format(**fields))
+    return posts
+
+def load_corpus(path):
+    """Posts recorded to a JSON list of strings or a text file with one post per line."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return [str(post) for post in json.load(f)]
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+def synthetic_ohlcv(bars, seed=0, freq='min', end=None, tz=None):
+    """Random-walk OHLCV bars with a realistic price range.
+
+    Bars start on 2000-01-03 at the given frequency, or end at ``end``
+    when it is given (e.g. today, for daily bars a price store will serve).
+    """
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    open_ = close * (1 + rng.normal(0, 0.003, bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, bars)))
+    volume = rng.integers(100_000, 10_000_000, bars)
+    if end is None:
+        index = pd.date_range('2000-01-03', periods=bars, freq=freq, tz=tz)
+    else:
+        index = pd.date_range(end=end, periods=bars, freq=freq, tz=tz)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                        index=index)
+
+def synthetic_panel(bars, tickers, seed=0):
+    """Wide (field, ticker) OHLCV frame for len(tickers) tickers, as yf.download returns."""
+    frames = {ticker: synthetic_ohlcv(bars, seed + i, freq='B') for i, ticker in enumerate(tickers)}
+    return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+
+class StubPriceProvider:
+    """PriceStore provider serving synthetic daily bars that end today.
+
+    Each ticker gets its own seeded random walk of history_bars business
+    days, so repeated and incremental requests see consistent prices.
+    """
+
+    def __init__(self, history_bars=TIMEFRAME_BARS['5Y'] + 300, tz='America/New_York', latency=0.0):
+        self.history_bars = history_bars
+        self.tz = tz
+        self.latency = latency
+        self.calls = 0
+
+    def _history(self, ticker):
+        seed = sum(ticker.encode('utf-8'))
+        end = pd.Timestamp.now(tz=self.tz).normalize()
+        return synthetic_ohlcv(self.history_bars, seed, freq='B', end=end.tz_localize(None)).tz_localize(self.tz)
+
+    def __call__(self, ticker, start=None, period=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        bars = self._history(ticker)
+        if start is not None:
+            return bars[bars.index >= pd.Timestamp(start, tz=self.tz)]
+        return bars
+
+class _StubTwitter:
+    def __init__(self, corpus, latency):
+        self.corpus = corpus
+        self.latency = latency
+
+    def search_tweets(self, q, lang=None, count=100):
+        time.sleep(self.latency)
+        return [SimpleNamespace(text=text) for text in self.corpus[:count]]
+
+class _StubSubreddit:
+    def __init__(self, corpus, latency):
+        self.corpus = corpus
+        self.latency = latency
+
+    def search(self, query, limit=10):
+        time.sleep(self.latency)
+        return [SimpleNamespace(title=text) for text in self.corpus[:limit]]
+
+class _StubReddit:
+    def __init__(self, corpus, latency):
+        self.corpus = corpus
+        self.latency = latency
+
+    def subreddit(self, name):
+        offset = sum(name.encode('utf-8')) % max(len(self.corpus), 1)
+        return _StubSubreddit(self.corpus[offset:] + self.corpus[:offset], self.latency)
+
+class _StubNews:
+    def __init__(self, corpus, latency):
+        self.corpus = corpus
+        self.latency = latency
+
+    def get_everything(self, q, from_param=None, language=None, sort_by=None):
+        time.sleep(self.latency)
+        return {'articles': [{'title': text, 'source': {'name': 'Newswire'}} for text in self.corpus[:100]]}
+
+def stub_clients(corpus, latency=0.0):
+    """Offline stand-ins for the Twitter, Reddit and NewsAPI clients, for fetch_all(clients=...).
+
+    Each call sleeps for latency seconds to model the network round trip.
+    """
+    return {
+        'twitter': _StubTwitter(corpus, latency),
+        'reddit': _StubReddit(corpus, latency),
+        'news': _StubNews(list(reversed(corpus)), latency)
+    }
+
+def measure(func, repeat=5, setup=None):
+    """Best, median and mean wall seconds of func() over repeat runs.
+
+    setup() runs before every call and is not timed.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        'best_seconds': min(times),
+        'median_seconds': statistics.median(times),
+        'mean_seconds': statistics.fmean(times),
+        'repeat': repeat
+    }
+
+def environment():
+    """Where the results were measured, so runs on different machines are not compared blindly."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+def write_results(path, suite, results):
+    """Write a suite's result rows as JSON; '-' writes to stdout."""
+    payload = {
+        'suite': suite,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': environment(),
+        'results': results
+    }
+    if path == '-':
+        json.dump(payload, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2)
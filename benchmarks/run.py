@@ -0,0 +1,107 @@
+"""Run every benchmark suite and write one JSON results file.
+
+Each suite runs in its own interpreter so caches and imports do not leak
+between them. With --compare, every timing is checked against an earlier
+results file and the run fails when any case got slower than --threshold.
+
+    python benchmarks/run.py [--suites sentiment pipeline] [--quick] [--output results.json]
+    python benchmarks/run.py --compare baseline.json [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from fixtures import ROOT, environment
+
+BENCHMARKS = os.path.join(ROOT, 'benchmarks')
+
+SUITES = {
+    'import': 'bench_import.py',
+    'sentiment': 'bench_sentiment.py',
+    'indicators': 'bench_indicators.py',
+    'database': 'bench_database.py',
+    'pipeline': 'bench_pipeline.py'
+}
+
+# Smaller inputs for a fast smoke run, e.g. in CI
+QUICK_ARGS = {
+    'import': ['--repeat', '2'],
+    'sentiment': ['--sizes', '100', '1000'],
+    'indicators': ['--bars', '1250', '100000', '--tickers', '10', '100'],
+    'database': ['--rows', '1000', '--repeat', '5'],
+    'pipeline': ['--timeframes', '1M', '5Y', '--repeat', '2']
+}
+
+def run_suite(name, quick=False):
+    """Run one suite in a fresh interpreter and return its result rows."""
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, f"{name}.json")
+        command = [sys.executable, os.path.join(BENCHMARKS, SUITES[name]), '--json', path]
+        subprocess.run(command + (QUICK_ARGS[name] if quick else []), cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['results']
+
+def timings(results):
+    """(suite, case, metric) -> seconds for every timing in a results file."""
+    found = {}
+    for suite, rows in results['suites'].items():
+        for row in rows:
+            for metric, value in row.items():
+                if metric.endswith('seconds') and metric != 'latency_seconds' and isinstance(value, (int, float)):
+                    found[(suite, row['case'], metric)] = value
+    return found
+
+def compare(current, baseline, threshold):
+    """Rows of (suite, case, metric, baseline, current, ratio) and whether any regressed."""
+    before = timings(baseline)
+    rows = []
+    regressed = False
+    for key, seconds in sorted(timings(current).items()):
+        if key not in before or not before[key]:
+            continue
+        ratio = seconds / before[key]
+        regressed = regressed or ratio > 1 + threshold
+        rows.append(key + (before[key], seconds, ratio))
+    return rows, regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--suites', nargs='+', default=list(SUITES), choices=list(SUITES))
+    parser.add_argument('--quick', action='store_true', help="smaller inputs for a fast smoke run")
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help="earlier results file to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="fractional slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    results = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'quick': args.quick,
+        'environment': environment(),
+        'suites': {}
+    }
+    for name in args.suites:
+        started = time.perf_counter()
+        results['suites'][name] = run_suite(name, args.quick)
+        print(f"{name:<12} {len(results['suites'][name]):>4} cases in {time.perf_counter() - started:.1f}s")
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows, regressed = compare(results, baseline, args.threshold)
+        print(f"{'suite':<12} {'case':<36} {'metric':<22} {'before ms':>10} {'now ms':>10} {'ratio':>7}")
+        for suite, case, metric, before, now, ratio in rows:
+            flag = '  SLOWER' if ratio > 1 + args.threshold else ''
+            print(f"{suite:<12} {case:<36} {metric:<22} {before * 1e3:>10.2f} {now * 1e3:>10.2f} {ratio:>7.2f}{flag}")
+        if regressed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
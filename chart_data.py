@@ -0,0 +1,109 @@
+import os
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Upper bound on points per trace sent to the browser
+CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '1500'))
+
+def bucket_starts(n, max_points):
+    """Start offsets of at most max_points contiguous, near-equal buckets over n rows."""
+    buckets = min(n, max_points)
+    return np.unique(np.linspace(0, n, buckets, endpoint=False).astype(np.int64))
+
+def downsample_ohlcv(df, max_points=CHART_MAX_POINTS):
+    """Aggregate OHLCV bars into at most max_points buckets of consecutive bars.
+
+    Each bucket keeps its first open, highest high, lowest low, last close
+    and total volume, stamped with its first bar's time, so the candles
+    still span every price the full series reached.
+    """
+    if len(df) <= max_points:
+        return df
+    starts = bucket_starts(len(df), max_points)
+    ends = np.append(starts[1:], len(df)) - 1
+    data = {
+        'Open': df['Open'].to_numpy(dtype=np.float64)[starts],
+        'High': np.fmax.reduceat(df['High'].to_numpy(dtype=np.float64), starts),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(dtype=np.float64), starts),
+        'Close': df['Close'].to_numpy(dtype=np.float64)[ends]
+    }
+    if 'Volume' in df:
+        data['Volume'] = np.add.reduceat(np.nan_to_num(df['Volume'].to_numpy(dtype=np.float64)), starts)
+    return pd.DataFrame(data, index=df.index[starts])
+
+def lttb_indices(x, y, max_points):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps from (x, y).
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    from the previous bucket and the mean of the next bucket, which
+    preserves peaks and troughs far better than striding.
+    """
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Interior points split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_x = x[hi:edges[b + 2]].mean()
+            next_y = y[hi:edges[b + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs(
+            (x[previous] - next_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (next_y - y[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        keep[b + 1] = previous
+    return keep
+
+def downsample_series(series, max_points=CHART_MAX_POINTS):
+    """LTTB-downsample a line series indexed by time, dropping missing values first."""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb_indices(x, series.to_numpy(dtype=np.float64), max_points)]
+
+def build_price_figure(hist, overlays=None, max_points=CHART_MAX_POINTS, title=None, template=None):
+    """Candlestick figure of hist with line overlays, each trace capped at max_points.
+
+    overlays maps a trace name to a (series, line) pair, e.g.
+    {'20-day SMA': (indicators['SMA_20'], dict(color='blue'))}. Overlays
+    should be computed on the full-resolution history before calling this.
+    """
+    import plotly.graph_objects as go
+    candles = downsample_ohlcv(hist, max_points)
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=candles.index,
+        open=candles['Open'],
+        high=candles['High'],
+        low=candles['Low'],
+        close=candles['Close'],
+        name='Price'
+    ))
+    for name, (series, line) in (overlays or {}).items():
+        points = downsample_series(series, max_points)
+        fig.add_trace(go.Scatter(x=points.index, y=points, name=name, line=line))
+    fig.update_layout(
+        title=title,
+        yaxis_title='Price',
+        xaxis_title='Date',
+        template=template
+    )
+    return fig
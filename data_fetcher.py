@@ -1,91 +1,475 @@
-import tweepy
-import praw
-from newsapi import NewsApiClient
+import itertools
 import os
+import threading
+import time
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
+from fetch_cache import TTLCache, TokenBucket, RateLimited
+from instrumentation import span, record, count, error, register_stats, submit
 from datetime import datetime, timedelta
 
 # Load environment variables
 load_dotenv()
 
+# Environment variables holding each source's credentials
+CREDENTIAL_VARS = {
+    'twitter': ('TWITTER_API_KEY', 'TWITTER_API_SECRET',
+                'TWITTER_ACCESS_TOKEN', 'TWITTER_ACCESS_TOKEN_SECRET'),
+    'reddit': ('REDDIT_CLIENT_ID', 'REDDIT_CLIENT_SECRET', 'REDDIT_USER_AGENT'),
+    'news': ('NEWS_API_KEY',)
+}
+
+def _http_session():
+    """HTTP session with a keep-alive connection pool sized for the fetch pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 # Initialize API clients
-def init_twitter_api():
+def init_twitter_api(session=None):
     api_key = os.getenv('TWITTER_API_KEY')
     api_secret = os.getenv('TWITTER_API_SECRET')
     access_token = os.getenv('TWITTER_ACCESS_TOKEN')
     access_token_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
     if not all([api_key, api_secret, access_token, access_token_secret]):
         raise ValueError("Missing Twitter API credentials in environment variables.")
+    # API client libraries are imported on first use to keep startup fast
+    import tweepy
     auth = tweepy.OAuthHandler(api_key, api_secret)
     auth.set_access_token(access_token, access_token_secret)
-    return tweepy.API(auth)
+    api = tweepy.API(auth)
+    if session is not None:
+        api.session = session
+    return api
 
-def init_reddit_api():
+def init_reddit_api(session=None):
     client_id = os.getenv('REDDIT_CLIENT_ID')
     client_secret = os.getenv('REDDIT_CLIENT_SECRET')
     user_agent = os.getenv('REDDIT_USER_AGENT')
     if not all([client_id, client_secret, user_agent]):
         raise ValueError("Missing Reddit API credentials in environment variables.")
+    import praw
     return praw.Reddit(
         client_id=client_id,
         client_secret=client_secret,
-        user_agent=user_agent
+        user_agent=user_agent,
+        requestor_kwargs={'session': session} if session is not None else None
     )
 
-def init_news_api():
+def init_news_api(session=None):
     api_key = os.getenv('NEWS_API_KEY')
     if not api_key:
         raise ValueError("Missing News API key in environment variables.")
-    return NewsApiClient(api_key=api_key)
+    from newsapi import NewsApiClient
+    return NewsApiClient(api_key=api_key, session=session)
+
+CLIENT_FACTORIES = {
+    'twitter': init_twitter_api,
+    'reddit': init_reddit_api,
+    'news': init_news_api
+}
+
+# Sources whose clients must not be shared between threads (praw.Reddit is not thread-safe)
+THREAD_LOCAL_SOURCES = {'reddit'}
+
+class ClientRegistry:
+    """Builds each API client once per process and reuses it.
+
+    Every client gets its own pooled HTTP session, so repeated fetches reuse
+    open TCP/TLS connections. A client is rebuilt when the credentials in
+    the environment change or after invalidate(), e.g. on an auth failure.
+    Clients for THREAD_LOCAL_SOURCES are built once per thread instead.
+    """
+
+    def __init__(self, factories=None, thread_local_sources=THREAD_LOCAL_SOURCES):
+        self._factories = factories or CLIENT_FACTORIES
+        self._thread_local_sources = thread_local_sources
+        self._clients = {}
+        self._local = threading.local()
+        # Bumped by invalidate() so other threads drop their own copies too
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _build(self, source):
+        session = _http_session()
+        try:
+            return self._factories[source](session=session), session
+        except Exception:
+            session.close()
+            raise
+
+    def get(self, source):
+        """Return the client for a source, building it if needed."""
+        credentials = tuple(os.getenv(name) for name in CREDENTIAL_VARS.get(source, ()))
+        if source in self._thread_local_sources:
+            return self._get_local(source, credentials)
+        with self._lock:
+            entry = self._clients.get(source)
+            if entry is not None and entry[0] == credentials:
+                return entry[1]
+            client, session = self._build(source)
+            self._clients[source] = (credentials, client, session)
+            if entry is not None:
+                entry[2].close()
+            return client
+
+    def _get_local(self, source, credentials):
+        clients = self._local.__dict__.setdefault('clients', {})
+        with self._lock:
+            generation = self._generations.get(source, 0)
+        entry = clients.get(source)
+        if entry is not None and entry[0] == (credentials, generation):
+            return entry[1]
+        client, session = self._build(source)
+        clients[source] = ((credentials, generation), client, session)
+        if entry is not None:
+            entry[2].close()
+        return client
+
+    def invalidate(self, source=None):
+        """Drop one client, or all of them, so the next get() rebuilds it."""
+        with self._lock:
+            sources = [source] if source else list(self._clients) + list(self._thread_local_sources)
+            for name in sources:
+                if name in self._thread_local_sources:
+                    self._generations[name] = self._generations.get(name, 0) + 1
+                entry = self._clients.pop(name, None)
+                if entry is not None:
+                    entry[2].close()
+
+    def refresh(self):
+        """Reload .env and rebuild any client whose credentials changed."""
+        load_dotenv(override=True)
+        with self._lock:
+            stale = [source for source, entry in self._clients.items()
+                     if entry[0] != tuple(os.getenv(name) for name in CREDENTIAL_VARS[source])]
+        # Per-thread clients compare their credentials on every get()
+        for source in stale:
+            self.invalidate(source)
+
+# Process-wide client registry
+registry = ClientRegistry()
+
+def get_client(source):
+    """Return the shared client for 'twitter', 'reddit' or 'news'."""
+    return registry.get(source)
 
 # Fetch data from different sources
-def fetch_tweets(ticker):
+SUBREDDITS = ['stocks', 'investing', 'wallstreetbets']
+
+# Seconds each source gets before fetch_all gives up on it
+SOURCE_TIMEOUTS = {
+    'twitter': 10.0,
+    'reddit': 10.0,
+    'news': 10.0
+}
+
+ERROR_MESSAGES = {
+    'twitter': "Error fetching tweets. Please check your Twitter API credentials.",
+    'reddit': "Error fetching Reddit posts. Please check your Reddit API credentials.",
+    'news': "Error fetching news. Please check your News API credentials."
+}
+
+RATE_LIMITED_MESSAGES = {
+    'twitter': "Twitter rate limit reached. Please try again in a few minutes.",
+    'reddit': "Reddit rate limit reached. Please try again in a few minutes.",
+    'news': "News API rate limit reached. Please try again later."
+}
+
+def failure_message(source, failure):
+    """Text to show for a source that returned no posts because of failure ('error' or 'rate_limited')."""
+    return (RATE_LIMITED_MESSAGES if failure == 'rate_limited' else ERROR_MESSAGES)[source]
+
+# Seconds a fetched result is reused for identical (source, ticker, params) requests
+FETCH_TTLS = {
+    'twitter': 60.0,
+    'reddit': 300.0,
+    'news': 900.0
+}
+
+# Upstream quotas as (calls, per seconds)
+RATE_LIMITS = {
+    'twitter': (180, 900),
+    'reddit': (100, 60),
+    'news': (100, 86400)
+}
+
+# Shared pool for network calls; threads are started lazily
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='fetch')
+
+# Shared response cache and per-provider rate limiters
+fetch_cache = TTLCache(max_entries=4096)
+rate_limiters = {source: TokenBucket(calls / period, capacity=calls)
+                 for source, (calls, period) in RATE_LIMITS.items()}
+register_stats('fetch_cache', fetch_cache.stats)
+
+# Cache-key component per injected client; id() alone could be reused once a client is freed
+_client_keys = weakref.WeakKeyDictionary()
+_client_counter = itertools.count(1)
+_client_keys_lock = threading.Lock()
+_client_locks = weakref.WeakKeyDictionary()
+
+def _client_key(client):
+    """None for the shared registry clients, otherwise a key unique to this client object."""
+    if client is None:
+        return None
+    try:
+        with _client_keys_lock:
+            key = _client_keys.get(client)
+            if key is None:
+                key = _client_keys[client] = ('client', next(_client_counter))
+            return key
+    except TypeError:
+        return ('client-id', id(client))
+
+def _client_lock(client):
+    """A lock serializing calls on an injected client that is not thread-safe."""
+    with _client_keys_lock:
+        lock = _client_locks.get(client)
+        if lock is None:
+            lock = _client_locks[client] = threading.Lock()
+        return lock
+
+def _cached_call(source, key, deadline, func, *args):
+    """Serve a call from the fetch cache, spending a rate-limit token on a miss.
+
+    Over quota, a call reserves the next token and sleeps until it is due,
+    so calls are spaced out in arrival order; it waits at most until its
+    deadline (or the source timeout when it has none). When even that is
+    too short it raises RateLimited, and the last cached response for the
+    key is served instead (however old) when there is one. A call whose
+    deadline passed while it was queued is skipped without taking a token,
+    and one that finds the same call already in flight waits for it only
+    until its own deadline.
+    """
+    def compute():
+        budget = SOURCE_TIMEOUTS[source] if deadline is None else deadline - time.monotonic()
+        if budget <= 0:
+            raise TimeoutError(f"{source} call started after its deadline")
+        wait = rate_limiters[source].try_acquire(max_wait=budget)
+        if wait is None:
+            raise RateLimited(f"{source} rate limit reached")
+        if wait > 0:
+            record(f"fetch.{source}.rate_limit_wait", wait)
+            time.sleep(wait)
+        with span(f"fetch.{source}.call") as tags:
+            result = func(*args)
+            tags['items'] = len(result)
+        count(f"fetch.{source}.items", len(result))
+        return result
+
+    cache_key = (source,) + key
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    try:
+        return fetch_cache.get_or_compute(cache_key, FETCH_TTLS[source], compute, timeout)
+    except RateLimited:
+        stale = fetch_cache.get_stale(cache_key)
+        if stale is None:
+            raise
+        count(f"fetch.{source}.stale_served")
+        return stale
+
+def invalidate_fetch_cache(ticker=None):
+    """Forget cached responses for one ticker, or for every ticker."""
+    if ticker is None:
+        fetch_cache.invalidate()
+    else:
+        fetch_cache.invalidate(lambda key: key[1] == ticker)
+
+def _search_tweets(api, ticker):
+    query = f"${ticker} stock"
+    tweets = api.search_tweets(q=query, lang="en", count=100)
+    return [tweet.text for tweet in tweets]
+
+def _search_subreddit(reddit, subreddit_name, ticker):
+    # praw.Reddit is not thread-safe: the shared client (None here) is this
+    # fetch thread's own, and calls on an injected one take turns
+    if reddit is None:
+        return _list_subreddit(get_client('reddit'), subreddit_name, ticker)
+    with _client_lock(reddit):
+        return _list_subreddit(reddit, subreddit_name, ticker)
+
+def _list_subreddit(reddit, subreddit_name, ticker):
+    subreddit = reddit.subreddit(subreddit_name)
+    search_results = subreddit.search(ticker, limit=10)
+    return [f"{post.title} - r/{subreddit_name}" for post in search_results]
+
+def _search_news(newsapi, ticker, from_date):
+    articles = newsapi.get_everything(
+        q=ticker,
+        from_param=from_date,
+        language='en',
+        sort_by='relevancy'
+    )
+    return [f"{article['title']} - {article['source']['name']}"
+            for article in articles['articles']]
+
+def _source_tasks(source, client, ticker, deadline=None, client_key=None):
+    """Independent calls that together make up one source.
+
+    client_key keeps responses from injected (e.g. stub) clients apart from
+    those of the shared clients in the fetch cache.
+    """
+    if source == 'twitter':
+        return [(_cached_call, ('twitter', (ticker, client_key), deadline, _search_tweets, client, ticker))]
+    if source == 'reddit':
+        return [(_cached_call, ('reddit', (ticker, name, client_key), deadline, _search_subreddit, client, name, ticker))
+                for name in SUBREDDITS]
+    from_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+    return [(_cached_call, ('news', (ticker, from_date, client_key), deadline, _search_news, client, ticker, from_date))]
+
+def _collect_source(source, futures, clients):
+    """Posts from a source's finished calls, whether any call missed the deadline, and any failure.
+
+    failure is None unless calls failed and no posts came back: then it is
+    'rate_limited' when every failed call was refused a rate-limit token,
+    and 'error' otherwise.
+    """
+    posts = []
+    rate_limited = False
+    failed = False
+    cut_short = False
+    for future in futures:
+        if future.cancelled() or not future.done():
+            cut_short = True
+            continue
+        try:
+            posts.extend(future.result())
+        except TimeoutError:
+            # Started after its deadline, or gave up waiting on the same call in flight
+            cut_short = True
+        except RateLimited:
+            count(f"fetch.{source}.rate_limited")
+            rate_limited = True
+        except Exception as e:
+            print(f"Error fetching {source}: {e}")
+            error(f"fetch.{source}", e)
+            failed = True
+    failure = None
+    if failed and not posts:
+        failure = 'error'
+        # Rebuild the shared client next time in case its session or auth went bad
+        if not clients.get(source):
+            registry.invalidate(source)
+    elif rate_limited and not posts:
+        failure = 'rate_limited'
+    return source, posts, cut_short, failure
+
+def _cancel(futures):
+    # Calls still queued never start; running ones finish in the background,
+    # and later requests for the same key join them rather than call again
+    for future in futures:
+        future.cancel()
+
+def _completed_sources(ready, pending, start, timeouts, clients):
+    try:
+        yield from ready
+        while pending:
+            now = time.monotonic()
+            for source in list(pending):
+                futures = pending[source]
+                if now >= start + timeouts[source] or all(future.done() for future in futures):
+                    del pending[source]
+                    collected = _collect_source(source, futures, clients)
+                    _cancel(futures)
+                    # Wall time from submission until the posts were handed to the caller
+                    record(f"fetch.{source}", time.monotonic() - start, posts=len(collected[1]),
+                           timed_out=collected[2], failure=collected[3])
+                    yield collected
+            if pending:
+                running = [future for futures in pending.values() for future in futures if not future.done()]
+                next_deadline = min(start + timeouts[source] for source in pending)
+                wait(running, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+    finally:
+        # The caller stopped iterating early
+        for futures in pending.values():
+            _cancel(futures)
+
+def iter_fetch(ticker, sources=None, timeouts=None, clients=None):
+    """Start fetching every source now and iterate over them as they finish.
+
+    The calls are submitted before this returns; the iterator then yields
+    (source, posts, timed_out, failure) for each source in completion
+    order, as soon as all of its calls are done or its deadline passes.
+    timed_out is True when the posts are partial because some calls missed
+    the deadline; failure is None, or 'error' / 'rate_limited' when the
+    source returned no posts for that reason (see failure_message()).
+    Calls still queued when their source is yielded, or when the caller
+    stops iterating, are cancelled.
+    """
+    sources = sources or list(SOURCE_TIMEOUTS)
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    clients = clients or {}
+    start = time.monotonic()
+
+    ready = []
+    pending = {}
+    for source in sources:
+        injected = clients.get(source)
+        try:
+            client = injected or get_client(source)
+        except Exception as e:
+            print(f"Error fetching {source}: {e}")
+            error(f"fetch.{source}", e)
+            ready.append((source, [], False, 'error'))
+            continue
+        if source in THREAD_LOCAL_SOURCES and not injected:
+            # Each fetch thread calls through its own copy of the shared client
+            client = None
+        tasks = _source_tasks(source, client, ticker, start + timeouts[source], _client_key(injected))
+        pending[source] = [submit(_executor, func, *args) for func, args in tasks]
+    return _completed_sources(ready, pending, start, timeouts, clients)
+
+def fetch_all(ticker, sources=None, timeouts=None, clients=None):
+    """Fetch every source concurrently with a per-source deadline.
+
+    All sources (and every subreddit) start at once, so the call takes as
+    long as the slowest source rather than the sum of them. Returns
+    (results, timed_out): results maps each source to its posts, holding
+    whatever finished before the deadline, or a one-item list with the
+    failure_message() of a source that failed; timed_out lists the sources
+    that were cut short. Pass stub objects in ``clients`` to skip the real
+    APIs.
+    """
+    sources = sources or list(SOURCE_TIMEOUTS)
+    finished = {}
+    for source, posts, cut_short, failure in iter_fetch(ticker, sources, timeouts, clients):
+        finished[source] = ([failure_message(source, failure)] if failure else posts, cut_short)
+    results = {source: finished[source][0] for source in sources}
+    timed_out = [source for source in sources if finished[source][1]]
+    return results, timed_out
+
+def fetch_tweets(ticker, api=None):
     """Fetch recent tweets about the given ticker."""
     try:
-        api = init_twitter_api()
-        query = f"${ticker} stock"
-        tweets = api.search_tweets(q=query, lang="en", count=100)
-        return [tweet.text for tweet in tweets]
+        (func, args), = _source_tasks('twitter', api or get_client('twitter'), ticker, client_key=_client_key(api))
+        return list(func(*args))
+    except RateLimited:
+        return [RATE_LIMITED_MESSAGES['twitter']]
     except Exception as e:
         print(f"Error fetching tweets: {e}")
-        return ["Error fetching tweets. Please check your Twitter API credentials."]
+        return [ERROR_MESSAGES['twitter']]
 
-def fetch_reddit_posts(ticker):
+def fetch_reddit_posts(ticker, reddit=None):
     """Fetch recent Reddit posts about the given ticker."""
-    try:
-        reddit = init_reddit_api()
-        subreddits = ['stocks', 'investing', 'wallstreetbets']
-        posts = []
-        
-        for subreddit_name in subreddits:
-            subreddit = reddit.subreddit(subreddit_name)
-            search_results = subreddit.search(ticker, limit=10)
-            for post in search_results:
-                posts.append(f"{post.title} - r/{subreddit_name}")
-        
-        return posts
-    except Exception as e:
-        print(f"Error fetching Reddit posts: {e}")
-        return ["Error fetching Reddit posts. Please check your Reddit API credentials."]
+    results, _ = fetch_all(ticker, sources=['reddit'], clients={'reddit': reddit})
+    return results['reddit']
 
-def fetch_news(ticker):
+def fetch_news(ticker, newsapi=None):
     """Fetch recent news articles about the given ticker."""
     try:
-        newsapi = init_news_api()
-        from_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        
-        articles = newsapi.get_everything(
-            q=ticker,
-            from_param=from_date,
-            language='en',
-            sort_by='relevancy'
-        )
-        
-        return [f"{article['title']} - {article['source']['name']}" 
-                for article in articles['articles']]
+        (func, args), = _source_tasks('news', newsapi or get_client('news'), ticker, client_key=_client_key(newsapi))
+        return list(func(*args))
+    except RateLimited:
+        return [RATE_LIMITED_MESSAGES['news']]
     except Exception as e:
         print(f"Error fetching news: {e}")
-        return ["Error fetching news. Please check your News API credentials."]
+        return [ERROR_MESSAGES['news']]
 
 def fetch_company_info(ticker):
     """Fetch detailed company information."""
@@ -1,16 +1,45 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+from sqlalchemy import create_engine, event, func, insert, select, update, case, delete, Column, Index, Integer, String, Float, DateTime, UniqueConstraint
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from datetime import datetime, timedelta
+import atexit
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from instrumentation import span, count, error, register_stats
+from sentiment_cache import content_hash
 
 # Load environment variables
 load_dotenv()
 
 # Create database engine
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./stock_sentiment.db')
-engine = create_engine(DATABASE_URL)
+
+def _engine_options(url):
+    """Pool settings per backend: SQLite is shared across threads, servers get a sized pool."""
+    if url.startswith('sqlite'):
+        return {'connect_args': {'check_same_thread': False, 'timeout': 30}}
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer thread and avoids an fsync per commit
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+if engine.dialect.name == 'sqlite':
+    event.listen(engine, 'connect', _set_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -25,6 +54,48 @@ class StockAnalysis(Base):
     volume = Column(Integer)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    # History lookups filter on ticker and order by timestamp
+    __table_args__ = (Index('ix_stock_analysis_ticker_timestamp', 'ticker', 'timestamp'),)
+
+class AnalysisRollup(Base):
+    """Per-ticker hourly or daily aggregate of StockAnalysis rows."""
+    __tablename__ = "analysis_rollup"
+
+    ticker = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True)  # 'hour' or 'day'
+    bucket_start = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False)
+    sentiment_sum = Column(Float, nullable=False)
+    sentiment_min = Column(Float, nullable=False)
+    sentiment_max = Column(Float, nullable=False)
+    last_price = Column(Float)
+    last_timestamp = Column(DateTime, nullable=False)
+    volume_sum = Column(Integer, nullable=False)
+
+    @property
+    def sentiment_mean(self):
+        return self.sentiment_sum / self.count
+
+class SentimentItem(Base):
+    """One scored post, tweet or headline, stored once per (ticker, source, content)."""
+    __tablename__ = "sentiment_item"
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    content_hash = Column(String(32), nullable=False)
+    text = Column(String)
+    vader = Column(Float)
+    textblob = Column(Float)
+    score = Column(Float)
+    seen_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('ticker', 'source', 'content_hash', name='uq_sentiment_item_content'),
+        # Trend queries filter on ticker (and source) over a time range
+        Index('ix_sentiment_item_ticker_seen_at', 'ticker', 'seen_at'),
+    )
+
 class User(Base):
     __tablename__ = "users"
     
@@ -43,8 +114,154 @@ class Watchlist(Base):
     added_at = Column(DateTime, default=datetime.utcnow)
 
 # Initialize database
+def _create_schema(connection):
+    Base.metadata.create_all(bind=connection)
+    # create_all skips indexes on tables that already existed
+    for index in StockAnalysis.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        _create_schema(connection)
+
+# Rollup granularities and the bucket each timestamp falls into
+ROLLUP_BUCKETS = {
+    'hour': lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    'day': lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0)
+}
+
+# History spans up to these lengths are served from finer data
+RAW_HISTORY_SPAN = timedelta(days=2)
+HOURLY_HISTORY_SPAN = timedelta(days=90)
+
+def _rollup_rows(rows):
+    """Aggregate analysis rows into one rollup delta per (ticker, bucket, bucket_start)."""
+    rollups = {}
+    for row in rows:
+        for bucket, truncate in ROLLUP_BUCKETS.items():
+            key = (row['ticker'], bucket, truncate(row['timestamp']))
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollups[key] = {
+                    'ticker': key[0], 'bucket': bucket, 'bucket_start': key[2],
+                    'count': 1,
+                    'sentiment_sum': row['sentiment'],
+                    'sentiment_min': row['sentiment'],
+                    'sentiment_max': row['sentiment'],
+                    'last_price': row['price'],
+                    'last_timestamp': row['timestamp'],
+                    'volume_sum': row['volume']
+                }
+                continue
+            rollup['count'] += 1
+            rollup['sentiment_sum'] += row['sentiment']
+            rollup['sentiment_min'] = min(rollup['sentiment_min'], row['sentiment'])
+            rollup['sentiment_max'] = max(rollup['sentiment_max'], row['sentiment'])
+            rollup['volume_sum'] += row['volume']
+            if row['timestamp'] >= rollup['last_timestamp']:
+                rollup['last_price'] = row['price']
+                rollup['last_timestamp'] = row['timestamp']
+    return list(rollups.values())
+
+def _merge_rollups(connection, rollups):
+    """Add rollup deltas to the stored aggregates, inserting new buckets."""
+    if not rollups:
+        return
+    table = AnalysisRollup.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        stmt = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(table)
+        new = stmt.excluded
+        newer = new.last_timestamp >= table.c.last_timestamp
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['ticker', 'bucket', 'bucket_start'],
+            set_={
+                'count': table.c.count + new.count,
+                'sentiment_sum': table.c.sentiment_sum + new.sentiment_sum,
+                'sentiment_min': case((new.sentiment_min < table.c.sentiment_min, new.sentiment_min),
+                                      else_=table.c.sentiment_min),
+                'sentiment_max': case((new.sentiment_max > table.c.sentiment_max, new.sentiment_max),
+                                      else_=table.c.sentiment_max),
+                'last_price': case((newer, new.last_price), else_=table.c.last_price),
+                'last_timestamp': case((newer, new.last_timestamp), else_=table.c.last_timestamp),
+                'volume_sum': table.c.volume_sum + new.volume_sum
+            }
+        )
+        connection.execute(stmt, rollups)
+        return
+
+    # Other backends: read-modify-write inside the caller's transaction
+    for rollup in rollups:
+        key = (table.c.ticker == rollup['ticker']) & (table.c.bucket == rollup['bucket']) \
+            & (table.c.bucket_start == rollup['bucket_start'])
+        current = connection.execute(select(table).where(key).with_for_update()).mappings().first()
+        if current is None:
+            connection.execute(insert(table), [rollup])
+            continue
+        newer = rollup['last_timestamp'] >= current['last_timestamp']
+        connection.execute(update(table).where(key).values(
+            count=current['count'] + rollup['count'],
+            sentiment_sum=current['sentiment_sum'] + rollup['sentiment_sum'],
+            sentiment_min=min(current['sentiment_min'], rollup['sentiment_min']),
+            sentiment_max=max(current['sentiment_max'], rollup['sentiment_max']),
+            last_price=rollup['last_price'] if newer else current['last_price'],
+            last_timestamp=rollup['last_timestamp'] if newer else current['last_timestamp'],
+            volume_sum=current['volume_sum'] + rollup['volume_sum']
+        ))
+
+def _insert_sentiment_items(connection, items):
+    """Bulk-insert sentiment items, skipping ones already stored."""
+    if not items:
+        return
+    table = SentimentItem.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        stmt = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(table)
+        connection.execute(stmt.on_conflict_do_nothing(
+            index_elements=['ticker', 'source', 'content_hash']
+        ), items)
+        return
+
+    # Other backends: filter out stored hashes first
+    unique = {}
+    for item in items:
+        unique.setdefault((item['ticker'], item['source'], item['content_hash']), item)
+    hashes = {key[2] for key in unique}
+    stored = set(connection.execute(
+        select(table.c.ticker, table.c.source, table.c.content_hash)
+        .where(table.c.content_hash.in_(hashes))
+    ).tuples())
+    fresh = [item for key, item in unique.items() if key not in stored]
+    if fresh:
+        connection.execute(insert(table), fresh)
+
+def _write_analyses(connection, rows, items=()):
+    """Insert analysis rows and their sentiment items, and fold the rows into the rollups.
+
+    Everything runs in the caller's transaction.
+    """
+    connection.execute(insert(StockAnalysis), rows)
+    _merge_rollups(connection, _rollup_rows(rows))
+    _insert_sentiment_items(connection, list(items))
+
+def rebuild_rollups(ticker=None, chunk_size=10000):
+    """Recompute rollups from the raw rows, e.g. for history saved before they existed."""
+    flush_analyses()
+    table = StockAnalysis.__table__
+    query = select(table.c.ticker, table.c.price, table.c.sentiment, table.c.volume, table.c.timestamp)
+    clear = delete(AnalysisRollup.__table__)
+    if ticker is not None:
+        query = query.where(table.c.ticker == ticker.upper())
+        clear = clear.where(AnalysisRollup.__table__.c.ticker == ticker.upper())
+    with engine.begin() as connection:
+        connection.execute(clear)
+        result = connection.execution_options(yield_per=chunk_size).execute(query)
+        for chunk in result.mappings().partitions():
+            rows = [
+                {**row, 'volume': row['volume'] or 0, 'sentiment': row['sentiment'] or 0.0}
+                for row in chunk if row['timestamp'] is not None
+            ]
+            _merge_rollups(connection, _rollup_rows(rows))
 
 # Database operations
 def get_db():
@@ -54,37 +271,377 @@ def get_db():
     finally:
         db.close()
 
+def _analysis_row(ticker, data):
+    """Plain column values for one StockAnalysis insert."""
+    return {
+        'ticker': ticker.upper(),
+        'price': float(data['price']),
+        'sentiment': float(data['sentiment']),
+        'volume': int(data['volume']),
+        'timestamp': data.get('timestamp') or datetime.utcnow()
+    }
+
+def _sentiment_item_rows(ticker, data, seen_at):
+    """Rows for the scored texts in data['sentiment_items'], if any.
+
+    Each item is a dict with source, text, vader, textblob and combined
+    score, and optionally a timestamp (defaults to seen_at).
+    """
+    return [
+        {
+            'ticker': ticker.upper(),
+            'source': item['source'],
+            'content_hash': content_hash(item['text']),
+            'text': item['text'],
+            'vader': float(item['vader']),
+            'textblob': float(item['textblob']),
+            'score': float(item['score']),
+            'seen_at': item.get('timestamp') or seen_at
+        }
+        for item in data.get('sentiment_items') or ()
+    ]
+
+class AnalysisWriter:
+    """Buffers analysis rows and writes them in batched multi-row inserts.
+
+    submit() only appends to an in-memory buffer. A background thread
+    flushes it in one transaction whenever it holds batch_size rows or its
+    oldest row has waited flush_interval seconds, so callers never wait on
+    the database and a refresh of many tickers costs a handful of commits.
+    A failed batch is retried up to retries times, backing off from
+    retry_delay seconds, and then written one row per transaction so only
+    rows that cannot be written are dropped (and counted).
+    """
+
+    def __init__(self, bind=None, batch_size=500, flush_interval=1.0, retries=2, retry_delay=0.5):
+        self.bind = bind if bind is not None else engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._rows = []
+        self._items = []
+        self._oldest = None
+        self._pending = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+        self.written = 0
+        self.dropped = 0
+        self.retried = 0
+        self.batches = 0
+
+    def submit(self, ticker, data):
+        """Queue one analysis result for writing."""
+        self.submit_many([(ticker, data)])
+
+    def submit_many(self, items):
+        """Queue (ticker, data) pairs for writing."""
+        items = list(items)
+        rows = [_analysis_row(ticker, data) for ticker, data in items]
+        if not rows:
+            return
+        # Sentiment items travel with the analysis row they belong to
+        item_rows = [_sentiment_item_rows(ticker, data, row['timestamp'])
+                     for (ticker, data), row in zip(items, rows)]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AnalysisWriter is closed")
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.extend(rows)
+            self._items.extend(item_rows)
+            self._pending += len(rows)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='analysis-writer', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every queued row has been written; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self):
+        """Write any queued rows and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def stats(self):
+        """Counters for rows written, dropped after every attempt failed, and still queued."""
+        with self._cond:
+            return {
+                'written': self.written,
+                'dropped': self.dropped,
+                'retried': self.retried,
+                'batches': self.batches,
+                'pending': self._pending
+            }
+
+    def _next_batch(self):
+        # Wait until a size, age, flush or close threshold is reached
+        with self._cond:
+            while True:
+                if self._rows and (
+                    self._closed or self._flush_requested or len(self._rows) >= self.batch_size
+                ):
+                    break
+                if not self._rows:
+                    self._flush_requested = False
+                    if self._closed:
+                        return None
+                    self._cond.wait()
+                    continue
+                remaining = self._oldest + self.flush_interval - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._rows[:self.batch_size]
+            items = self._items[:self.batch_size]
+            del self._rows[:self.batch_size]
+            del self._items[:self.batch_size]
+            self._oldest = time.monotonic() if self._rows else None
+            return batch, items
+
+    def _write(self, rows, items):
+        with span('db.write', rows=len(rows), items=len(items)):
+            with self.bind.begin() as connection:
+                _write_analyses(connection, rows, items)
+
+    def _write_batch(self, batch, item_groups):
+        """Write a batch, retrying it and then falling back to one row at a time; returns rows written."""
+        items = [item for group in item_groups for item in group]
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+                with self._cond:
+                    self.retried += 1
+            try:
+                self._write(batch, items)
+                return len(batch)
+            except Exception as e:
+                error('db.write', e, rows=len(batch), attempt=attempt)
+        if len(batch) == 1:
+            print(f"Error saving analysis for {batch[0]['ticker']}: dropped after {self.retries + 1} attempts")
+            return 0
+        # Isolate the rows that keep failing so the rest of the batch still lands
+        written = 0
+        for row, group in zip(batch, item_groups):
+            try:
+                self._write([row], group)
+                written += 1
+            except Exception as e:
+                print(f"Error saving analysis for {row['ticker']}: {e}")
+                error('db.write_row', e, ticker=row['ticker'])
+        return written
+
+    def _run(self):
+        while True:
+            next_batch = self._next_batch()
+            if next_batch is None:
+                return
+            batch, item_groups = next_batch
+            written = self._write_batch(batch, item_groups)
+            count('db.rows_written', written)
+            if written < len(batch):
+                count('db.rows_dropped', len(batch) - written)
+            with self._cond:
+                self.written += written
+                self.dropped += len(batch) - written
+                self.batches += 1
+                self._pending -= len(batch)
+                self._cond.notify_all()
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_analysis_writer():
+    """Return the shared AnalysisWriter, flushed at interpreter exit."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AnalysisWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+register_stats('analysis_writer', lambda: _writer.stats() if _writer is not None else {})
+
 def save_analysis(ticker, data):
-    """Save stock analysis data to database."""
-    db = SessionLocal()
+    """Queue stock analysis data for the background database writer."""
     try:
-        analysis = StockAnalysis(
-            ticker=ticker,
-            price=data['price'],
-            sentiment=data['sentiment'],
-            volume=data['volume'],
-            timestamp=data['timestamp']
-        )
-        db.add(analysis)
-        db.commit()
+        get_analysis_writer().submit(ticker, data)
+    except Exception as e:
+        print(f"Error saving analysis: {e}")
+
+def save_analyses(items):
+    """Queue many (ticker, data) analysis results in one call."""
+    try:
+        get_analysis_writer().submit_many(items)
     except Exception as e:
         print(f"Error saving analysis: {e}")
-        db.rollback()
-    finally:
-        db.close()
+
+def flush_analyses(timeout=None):
+    """Wait for queued analysis rows to reach the database."""
+    if _writer is None:
+        return True
+    with span('db.flush'):
+        return _writer.flush(timeout)
 
 def get_recent_analysis(ticker, limit=10):
     """Get recent analysis data for a ticker."""
+    # Include rows still waiting in the writer's buffer
+    flush_analyses()
     db = SessionLocal()
     try:
-        return db.query(StockAnalysis)\
-            .filter(StockAnalysis.ticker == ticker)\
-            .order_by(StockAnalysis.timestamp.desc())\
-            .limit(limit)\
-            .all()
+        with span('db.read.recent_analysis', limit=limit):
+            return db.query(StockAnalysis)\
+                .filter(StockAnalysis.ticker == ticker.upper())\
+                .order_by(StockAnalysis.timestamp.desc())\
+                .limit(limit)\
+                .all()
+    finally:
+        db.close()
+
+def get_rollups(ticker, bucket='day', start=None, end=None):
+    """Rollup rows for a ticker at 'hour' or 'day' granularity, oldest first."""
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(f"Unsupported rollup bucket: {bucket}")
+    flush_analyses()
+    db = SessionLocal()
+    try:
+        query = db.query(AnalysisRollup)\
+            .filter(AnalysisRollup.ticker == ticker.upper(), AnalysisRollup.bucket == bucket)
+        if start is not None:
+            query = query.filter(AnalysisRollup.bucket_start >= ROLLUP_BUCKETS[bucket](start))
+        if end is not None:
+            query = query.filter(AnalysisRollup.bucket_start <= end)
+        with span('db.read.rollups', bucket=bucket):
+            return query.order_by(AnalysisRollup.bucket_start).all()
     finally:
         db.close()
 
+def get_daily_sentiment(tickers, start=None, end=None):
+    """Mean daily sentiment from the rollups as (ticker, day, sentiment) tuples for many tickers."""
+    flush_analyses()
+    table = AnalysisRollup.__table__
+    query = select(
+        table.c.ticker, table.c.bucket_start, (table.c.sentiment_sum / table.c.count).label('sentiment')
+    ).where(table.c.bucket == 'day', table.c.ticker.in_([ticker.upper() for ticker in tickers]))
+    if start is not None:
+        query = query.where(table.c.bucket_start >= start)
+    if end is not None:
+        query = query.where(table.c.bucket_start <= end)
+    with engine.connect() as connection:
+        return connection.execute(query.order_by(table.c.ticker, table.c.bucket_start)).all()
+
+def get_analysis_history(ticker, start, end=None):
+    """Sentiment and price history over a time range, at a resolution suited to its length.
+
+    Short ranges return the raw rows; longer ones read the hourly or daily
+    rollups so months of history cost a few hundred rows. Each point is a
+    dict with timestamp, sentiment (mean), sentiment_min/max, price (last)
+    and volume (total).
+    """
+    duration = (end or datetime.now()) - start
+    if duration > RAW_HISTORY_SPAN:
+        bucket = 'hour' if duration <= HOURLY_HISTORY_SPAN else 'day'
+        return [
+            {
+                'timestamp': rollup.bucket_start,
+                'sentiment': rollup.sentiment_mean,
+                'sentiment_min': rollup.sentiment_min,
+                'sentiment_max': rollup.sentiment_max,
+                'price': rollup.last_price,
+                'volume': rollup.volume_sum
+            }
+            for rollup in get_rollups(ticker, bucket, start, end)
+        ]
+
+    flush_analyses()
+    db = SessionLocal()
+    try:
+        query = db.query(StockAnalysis)\
+            .filter(StockAnalysis.ticker == ticker.upper(), StockAnalysis.timestamp >= start)
+        if end is not None:
+            query = query.filter(StockAnalysis.timestamp <= end)
+        return [
+            {
+                'timestamp': row.timestamp,
+                'sentiment': row.sentiment,
+                'sentiment_min': row.sentiment,
+                'sentiment_max': row.sentiment,
+                'price': row.price,
+                'volume': row.volume
+            }
+            for row in query.order_by(StockAnalysis.timestamp).all()
+        ]
+    finally:
+        db.close()
+
+def _bucket_start(dialect, bucket, column):
+    """SQL expression truncating a timestamp column to the start of its hour or day."""
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    if dialect == 'postgresql':
+        return func.date_trunc(bucket, column)
+    fmt = '%Y-%m-%d %H:00:00' if bucket == 'hour' else '%Y-%m-%d 00:00:00'
+    if dialect == 'mysql':
+        return func.date_format(column, fmt)
+    return func.strftime(fmt, column)
+
+def get_source_sentiment_trend(ticker, bucket='hour', start=None, end=None, sources=None):
+    """Per-source sentiment of stored items, aggregated into time buckets by the database.
+
+    Returns one dict per (source, bucket) with bucket_start, items, the mean,
+    min and max combined score, and positive/negative counts by VADER
+    compound (the +-0.05 thresholds of get_sentiment_breakdown), ordered by
+    source and time.
+    """
+    flush_analyses()
+    table = SentimentItem.__table__
+    bucket_start = _bucket_start(engine.dialect.name, bucket, table.c.seen_at).label('bucket_start')
+    query = select(
+        table.c.source,
+        bucket_start,
+        func.count().label('items'),
+        func.avg(table.c.score).label('sentiment'),
+        func.min(table.c.score).label('sentiment_min'),
+        func.max(table.c.score).label('sentiment_max'),
+        func.sum(case((table.c.vader >= 0.05, 1), else_=0)).label('positive'),
+        func.sum(case((table.c.vader <= -0.05, 1), else_=0)).label('negative')
+    ).where(table.c.ticker == ticker.upper())
+    if start is not None:
+        query = query.where(table.c.seen_at >= start)
+    if end is not None:
+        query = query.where(table.c.seen_at <= end)
+    if sources is not None:
+        query = query.where(table.c.source.in_(list(sources)))
+    query = query.group_by(table.c.source, bucket_start).order_by(table.c.source, bucket_start)
+
+    with engine.connect() as connection:
+        rows = connection.execute(query).mappings().all()
+    trend = []
+    for row in rows:
+        point = dict(row)
+        # SQLite and MySQL format the bucket as text
+        if isinstance(point['bucket_start'], str):
+            point['bucket_start'] = datetime.fromisoformat(point['bucket_start'])
+        trend.append(point)
+    return trend
+
 def add_to_watchlist(user_id, ticker):
     """Add a ticker to user's watchlist."""
     db = SessionLocal()
@@ -107,4 +664,33 @@ def get_watchlist(user_id):
             .order_by(Watchlist.added_at.desc())\
             .all()
     finally:
-        db.close() 
\ No newline at end of file
+        db.close() 
+def get_watched_tickers():
+    """Every ticker on any user's watchlist, mapped to how many users watch it."""
+    db = SessionLocal()
+    try:
+        rows = db.query(Watchlist.ticker, func.count(func.distinct(Watchlist.user_id)))\
+            .group_by(Watchlist.ticker)\
+            .all()
+        watched = {}
+        for ticker, watchers in rows:
+            watched[ticker.upper()] = watched.get(ticker.upper(), 0) + watchers
+        return watched
+    finally:
+        db.close()
+
+def get_latest_analysis_times(tickers):
+    """Timestamp of the newest saved analysis for each ticker that has one."""
+    tickers = list(tickers)
+    flush_analyses()
+    db = SessionLocal()
+    try:
+        rows = db.query(StockAnalysis.ticker, func.max(StockAnalysis.timestamp))\
+            .filter(StockAnalysis.ticker.in_({ticker.upper() for ticker in tickers}))\
+            .group_by(StockAnalysis.ticker)\
+            .all()
+        latest = dict(rows)
+        # Keyed by the tickers as they were passed in
+        return {ticker: latest[ticker.upper()] for ticker in tickers if ticker.upper() in latest}
+    finally:
+        db.close()
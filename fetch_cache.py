@@ -0,0 +1,169 @@
+from collections import OrderedDict
+import math
+import threading
+import time
+
+class _Flight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class TTLCache:
+    """Thread-safe cache whose entries expire after a per-call TTL.
+
+    Concurrent get_or_compute() calls for the same key collapse into a single
+    computation: the first caller runs it and the rest wait for its result,
+    so at most one is in flight per key. Exceptions are passed to every
+    waiter but never cached.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, key):
+        """Return the last value stored for key even if it has expired (None once evicted)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key, value, ttl):
+        """Store a value for ttl seconds."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, ttl, compute, timeout=None):
+        """Return the cached value for key, calling compute() at most once to fill it.
+
+        A caller that joins a computation already in progress waits at most
+        timeout seconds for it and then raises TimeoutError; the computation
+        itself carries on.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not flight.done.wait(timeout):
+                raise TimeoutError(f"Gave up waiting {timeout}s for an in-flight call")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.set(key, flight.value, ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def invalidate(self, predicate=None):
+        """Drop every entry, or only those whose key matches predicate(key)."""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def stats(self):
+        """Hit/miss counters; 'shared' counts callers that joined an in-flight call."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared': self.shared,
+                'hit_rate': (self.hits + self.shared) / lookups if lookups else 0.0,
+                'entries': len(self._entries)
+            }
+
+class RateLimited(Exception):
+    """A call would have to wait for a rate-limit token longer than its caller allows."""
+
+class TokenBucket:
+    """Token-bucket rate limiter.
+
+    Tokens refill at ``rate`` per second up to ``capacity``. A caller only
+    takes tokens when they will be available within the wait it can afford
+    (try_acquire's max_wait, acquire's timeout); otherwise nothing is
+    reserved, so callers that give up never leave debt behind for the
+    next ones. Tokens that were taken but not spent can be refunded.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1, max_wait=0.0):
+        """Reserve tokens if they are available within max_wait seconds.
+
+        Returns the seconds the caller must wait before using them, or None
+        (reserving nothing) when that would exceed max_wait.
+        """
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= tokens
+            return wait
+
+    def refund(self, tokens=1):
+        """Return tokens that were reserved but never spent."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until the tokens are available, raising RateLimited if that takes over timeout seconds."""
+        wait = self.try_acquire(tokens, math.inf if timeout is None else timeout)
+        if wait is None:
+            raise RateLimited(f"No token within {timeout}s")
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,188 @@
+from collections import deque
+import math
+import pandas as pd
+from technical_analysis import INDICATOR_NAMES
+
+class _Window:
+    """Fixed-size rolling window with O(1) mean and sample standard deviation.
+
+    The mean and sum of squared deviations are updated with Welford's
+    add/remove steps and recomputed from the buffer once per window length
+    to keep rounding drift bounded on long streams.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.mean_ = 0.0
+        self.m2 = 0.0
+        self.nonzero = 0
+        self.pushes = 0
+
+    def push(self, x):
+        if len(self.values) == self.size:
+            self._remove(self.values.popleft())
+        self.values.append(x)
+        self._add(x)
+        self.pushes += 1
+        if self.pushes % self.size == 0:
+            self._resync()
+
+    def _add(self, x):
+        n = len(self.values)
+        delta = x - self.mean_
+        self.mean_ += delta / n
+        self.m2 += delta * (x - self.mean_)
+        if x != 0:
+            self.nonzero += 1
+
+    def _remove(self, y):
+        n = len(self.values)
+        if n == 0:
+            self.mean_ = self.m2 = 0.0
+        else:
+            delta = y - self.mean_
+            self.mean_ -= delta / n
+            self.m2 -= delta * (y - self.mean_)
+        if y != 0:
+            self.nonzero -= 1
+
+    def _resync(self):
+        n = len(self.values)
+        self.mean_ = math.fsum(self.values) / n
+        self.m2 = math.fsum((v - self.mean_) ** 2 for v in self.values)
+
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        if not self.full():
+            return math.nan
+        # A window of exact zeros (e.g. no losses for RSI) must average to exactly 0
+        return self.mean_ if self.nonzero else 0.0
+
+    def std(self):
+        if not self.full():
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.size - 1))
+
+class _EMA:
+    """Exponential moving average matching pandas ewm(span, adjust=False)."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def push(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+def _divide(a, b):
+    # Float division with NumPy semantics (x/0 -> +-inf, 0/0 -> nan)
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return math.nan
+        return math.copysign(math.inf, a)
+    return a / b
+
+class IndicatorState:
+    """Running state for calculate_technical_indicators over a growing series.
+
+    Feed bars one at a time with update(); each call costs O(1) regardless
+    of how much history has been seen and returns the newest value of every
+    indicator, equal (to floating-point rounding) to the last row of the
+    batch function on the full history. Bars are assumed to have no missing
+    OHLCV values, as returned by yfinance.
+    """
+
+    def __init__(self):
+        self.sma_20 = _Window(20)
+        self.sma_50 = _Window(50)
+        self.sma_200 = _Window(200)
+        self.ema_12 = _EMA(12)
+        self.ema_26 = _EMA(26)
+        self.macd_signal = _EMA(9)
+        self.gain = _Window(14)
+        self.loss = _Window(14)
+        self.volume = _Window(20)
+        self.true_range = _Window(14)
+        self.prev_close = None
+        self.count = 0
+        self.latest = dict.fromkeys(INDICATOR_NAMES, math.nan)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a state warmed up on an OHLCV DataFrame."""
+        state = cls()
+        state.update_frame(df)
+        return state
+
+    def update(self, open_, high, low, close, volume):
+        """Add one bar and return the latest indicator values."""
+        close = float(close)
+        high = float(high)
+        low = float(low)
+        volume = float(volume)
+
+        self.sma_20.push(close)
+        self.sma_50.push(close)
+        self.sma_200.push(close)
+        self.volume.push(volume)
+
+        ema_12 = self.ema_12.push(close)
+        ema_26 = self.ema_26.push(close)
+        macd = ema_12 - ema_26
+        macd_signal = self.macd_signal.push(macd)
+
+        # The first bar has no previous close: the batch function counts its
+        # gain and loss as 0 and its true range as high - low
+        if self.prev_close is None:
+            gain = loss = 0.0
+            true_range = high - low
+        else:
+            delta = close - self.prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.gain.push(gain)
+        self.loss.push(loss)
+        self.true_range.push(true_range)
+        self.prev_close = close
+        self.count += 1
+
+        rs = _divide(self.gain.mean(), self.loss.mean())
+        rsi = 100 - (100 / (1 + rs)) if not math.isnan(rs) else math.nan
+
+        bb_middle = self.sma_20.mean()
+        bb_std = self.sma_20.std()
+        volume_sma = self.volume.mean()
+
+        self.latest = {
+            'SMA_20': bb_middle,
+            'SMA_50': self.sma_50.mean(),
+            'SMA_200': self.sma_200.mean(),
+            'EMA_12': ema_12,
+            'EMA_26': ema_26,
+            'MACD': macd,
+            'MACD_Signal': macd_signal,
+            'MACD_Hist': macd - macd_signal,
+            'RSI': rsi,
+            'BB_Middle': bb_middle,
+            'BB_Upper': bb_middle + (bb_std * 2),
+            'BB_Lower': bb_middle - (bb_std * 2),
+            'Volume_SMA': volume_sma,
+            'Volume_Ratio': _divide(volume, volume_sma),
+            'ATR': self.true_range.mean()
+        }
+        return self.latest
+
+    def update_frame(self, df):
+        """Add every bar of an OHLCV DataFrame and return their indicator rows."""
+        rows = [
+            self.update(o, h, l, c, v)
+            for o, h, l, c, v in zip(df['Open'], df['High'], df['Low'], df['Close'], df['Volume'])
+        ]
+        return pd.DataFrame(rows, index=df.index, columns=INDICATOR_NAMES)
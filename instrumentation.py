@@ -0,0 +1,256 @@
+import contextvars
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Where span and metric events are logged as JSON lines: a file path, or 'stderr'
+METRICS_LOG = os.getenv('METRICS_LOG')
+
+# Directory profile() writes .prof files to (loadable with pstats or snakeviz)
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+
+logger = logging.getLogger('stock_sentiment.metrics')
+# Silent unless configure_metrics_log() or the application's logging config adds a handler
+logger.addHandler(logging.NullHandler())
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, merging the record's ``fields`` extra."""
+
+    def format(self, record):
+        payload = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage()
+        }
+        payload.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+def configure_metrics_log(target=METRICS_LOG):
+    """Log spans, errors and metric snapshots as JSON lines to a file path or 'stderr'."""
+    if not target or any(getattr(handler, '_metrics_log', False) for handler in logger.handlers):
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == 'stderr' else logging.FileHandler(target)
+    handler.setFormatter(JsonFormatter())
+    handler._metrics_log = True
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+class Trace:
+    """The spans and counters recorded while it is active, e.g. during one analysis run.
+
+    Spans carry their start offset from the beginning of the trace, so a
+    run can be shown as a timeline of overlapping stages.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Set when the trace() block exits
+        self.seconds = None
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, seconds, tags):
+        start = time.perf_counter() - seconds - self.started
+        with self._lock:
+            self.spans.append({'name': name, 'start': start, 'seconds': seconds, **tags})
+
+    def add_count(self, name, n):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def totals(self):
+        """Seconds spent per span name, largest first."""
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span['name']] = totals.get(span['name'], 0.0) + span['seconds']
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+_current_trace = contextvars.ContextVar('trace', default=None)
+
+class Metrics:
+    """Process-wide span timings and counters, plus registered stats sources.
+
+    Spans aggregate per name into count, total, min, max and last seconds;
+    the active Trace (if any) also receives each span and count. Stats
+    sources are callables returning a dict, such as a cache's stats(),
+    read whenever a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._counters = {}
+        self._sources = {}
+
+    def record(self, name, seconds, **tags):
+        """Record a finished span of seconds under name."""
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                self._spans[name] = [1, seconds, seconds, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = min(stats[2], seconds)
+                stats[3] = max(stats[3], seconds)
+                stats[4] = seconds
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(name, seconds, tags)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info('span', extra={'fields': {'name': name, 'seconds': seconds, **tags}})
+
+    @contextmanager
+    def span(self, name, **tags):
+        """Time the enclosed block; the yielded dict of tags can be extended inside it."""
+        start = time.perf_counter()
+        try:
+            yield tags
+        finally:
+            self.record(name, time.perf_counter() - start, **tags)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_count(name, n)
+
+    def error(self, name, error, **tags):
+        """Count an error under name + '.errors' and log it with its context."""
+        self.count(f"{name}.errors")
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning('error', extra={'fields': {'name': name, 'error': repr(error), **tags}})
+
+    def register(self, name, stats):
+        self._sources[name] = stats
+
+    def snapshot(self):
+        """Span aggregates, counters and the current value of every stats source."""
+        with self._lock:
+            spans = {
+                name: {
+                    'count': count,
+                    'total_seconds': total,
+                    'mean_seconds': total / count,
+                    'min_seconds': low,
+                    'max_seconds': high,
+                    'last_seconds': last
+                }
+                for name, (count, total, low, high, last) in sorted(self._spans.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+            sources = dict(self._sources)
+        stats = {}
+        for name, source in sorted(sources.items()):
+            try:
+                stats[name] = source()
+            except Exception as e:
+                stats[name] = {'error': repr(e)}
+        return {'time': time.time(), 'pid': os.getpid(), 'spans': spans, 'counters': counters, 'stats': stats}
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+# Process-wide metrics
+metrics = Metrics()
+
+def span(name, **tags):
+    """Time a block under name in the process-wide metrics (and the active trace)."""
+    return metrics.span(name, **tags)
+
+def record(name, seconds, **tags):
+    metrics.record(name, seconds, **tags)
+
+def count(name, n=1):
+    metrics.count(name, n)
+
+def error(name, e, **tags):
+    metrics.error(name, e, **tags)
+
+def register_stats(name, stats):
+    """Include stats() (a dict) under name in every metrics snapshot."""
+    metrics.register(name, stats)
+
+def metrics_snapshot():
+    return metrics.snapshot()
+
+def log_metrics():
+    """Log a metrics snapshot as one JSON event, e.g. once per worker cycle."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info('metrics', extra={'fields': metrics.snapshot()})
+
+def export_metrics(path):
+    """Write a metrics snapshot to path as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(metrics.snapshot(), f, indent=2, default=str)
+
+@contextmanager
+def trace():
+    """Collect the spans and counts recorded in this context (and tasks submitted with submit())."""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        current.seconds = current.elapsed()
+        _current_trace.reset(token)
+
+def submit(executor, func, *args):
+    """executor.submit() that carries the caller's trace into the worker thread."""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+class ProfileResult:
+    """Filled in when a profile() block exits: the top functions as text and the .prof path."""
+
+    def __init__(self):
+        self.text = ''
+        self.path = None
+
+@contextmanager
+def profile(name='profile', directory=PROFILE_DIR, top=30, sort='cumulative'):
+    """Run the enclosed block under cProfile.
+
+    Only the calling thread is profiled; work handed to thread pools (the
+    API fetches, the company lookup) shows up as time spent waiting, and
+    its own cost is covered by the spans instead. When directory is set the
+    raw stats are saved there as <name>-<time>-<pid>.prof.
+    """
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    result = ProfileResult()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(top)
+        result.text = stream.getvalue()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            result.path = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+            profiler.dump_stats(result.path)
+
+configure_metrics_log()
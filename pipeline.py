@@ -0,0 +1,298 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+from data_fetcher import iter_fetch, invalidate_fetch_cache
+from fetch_cache import TTLCache
+from instrumentation import span, record, count, error, register_stats, submit
+from price_store import get_price_store
+from sentiment_analysis import get_engine
+from technical_analysis import calculate_technical_indicators
+
+# Load environment variables
+load_dotenv()
+
+SENTIMENT_SOURCES = ('twitter', 'reddit', 'news')
+
+# Dashboard timeframes and the yfinance-style periods they cover
+TIMEFRAME_PERIODS = {
+    '1D': '1d', '1W': '5d', '1M': '1mo',
+    '3M': '3mo', '1Y': '1y', '5Y': '5y'
+}
+
+# Indicators the dashboard displays
+DISPLAY_INDICATORS = ['SMA_20', 'RSI', 'MACD']
+
+SNAPSHOT_TTL = int(os.getenv('SNAPSHOT_TTL_SECONDS', '300'))
+
+# Company profile lookups run beside the price and social fetches
+_info_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='company-info')
+
+# Analysis runs started by stream_snapshot(), independent of the sessions reading them
+_stream_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='analysis')
+
+def fetch_company_profile(ticker):
+    """Company profile and key statistics from yfinance ({} if unavailable)."""
+    import yfinance as yf
+    try:
+        with span('pipeline.company_info', ticker=ticker):
+            return yf.Ticker(ticker).info or {}
+    except Exception as e:
+        print(f"Error fetching company info: {e}")
+        error('pipeline.company_info', e, ticker=ticker)
+        return {}
+
+class AnalysisSnapshot:
+    """Everything the dashboard shows for one (ticker, timeframe).
+
+    Snapshots are shared between reruns and sessions through the snapshot
+    cache, so their DataFrames and lists must be treated as read-only.
+    """
+
+    def __init__(self, ticker, timeframe, hist, indicators, posts, timed_out,
+                 source_sentiment, info, created_at, batches=None, failures=None):
+        self.ticker = ticker
+        self.timeframe = timeframe
+        self.hist = hist
+        self.indicators = indicators
+        self.posts = posts
+        self.timed_out = timed_out
+        self.source_sentiment = source_sentiment
+        # Per-text scores (SentimentBatch) for each source's posts
+        self.batches = batches or {}
+        # Sources that returned no posts, mapped to 'error' or 'rate_limited'
+        self.failures = failures or {}
+        self.info = info
+        self.created_at = created_at
+
+    @property
+    def sentiment(self):
+        """Overall sentiment: the mean of the per-source scores, leaving out sources that failed."""
+        scores = [self.source_sentiment[source] for source in SENTIMENT_SOURCES if source not in self.failures]
+        return sum(scores) / len(scores) if scores else 0.0
+
+    def events(self):
+        """Replay the snapshot as the events iter_analysis() would yield."""
+        yield 'history', self.hist
+        yield 'indicators', self.indicators
+        for source in SENTIMENT_SOURCES:
+            yield 'sentiment', {
+                'source': source,
+                'posts': self.posts[source],
+                'score': self.source_sentiment[source],
+                'timed_out': source in self.timed_out,
+                'failure': self.failures.get(source)
+            }
+        yield 'info', self.info
+        yield 'snapshot', self
+
+    def sentiment_items(self):
+        """Each scored post as a dict for save_analysis()."""
+        items = []
+        for source, batch in self.batches.items():
+            for i, text in enumerate(self.posts[source]):
+                items.append({
+                    'source': source,
+                    'text': text,
+                    'vader': batch.vader[i],
+                    'textblob': batch.textblob[i],
+                    'score': batch.compound[i]
+                })
+        return items
+
+    def analysis(self):
+        """The latest price, volume and sentiment, in the shape save_analysis() accepts."""
+        return {
+            'price': self.hist['Close'].iloc[-1],
+            'sentiment': self.sentiment,
+            'volume': self.hist['Volume'].iloc[-1],
+            'timestamp': self.created_at,
+            'sentiment_items': self.sentiment_items()
+        }
+
+def iter_analysis(ticker, timeframe='1M', include_info=True, clients=None, store=None):
+    """Run the analysis pipeline, yielding (stage, value) events as each stage finishes.
+
+    The social fetches and company lookup start first and run while the
+    price history loads, so the 'history' and 'indicators' events arrive
+    after the price latency alone. One 'sentiment' event follows per
+    source in completion order, with a dict of source, posts, score,
+    timed_out and failure ('error' or 'rate_limited' for a source that
+    returned no posts, which is left out of the overall sentiment); then
+    'info' (once it is ready) and finally 'snapshot' with the complete
+    AnalysisSnapshot. clients (see fetch_all) and store (a PriceStore)
+    replace the shared API clients and price store, e.g. with offline
+    stubs.
+    """
+    ticker = ticker.upper()
+    started = time.perf_counter()
+    sources = iter_fetch(ticker, list(SENTIMENT_SOURCES), clients=clients)
+    info = submit(_info_executor, fetch_company_profile, ticker) if include_info else None
+
+    with span('pipeline.history', ticker=ticker, timeframe=timeframe):
+        hist = (store or get_price_store()).get_history(ticker, TIMEFRAME_PERIODS[timeframe])
+    if hist.empty:
+        raise ValueError(f"No price history for {ticker}")
+    yield 'history', hist
+    indicators = calculate_technical_indicators(hist, DISPLAY_INDICATORS)
+    yield 'indicators', indicators
+
+    posts = {}
+    timed_out = []
+    source_sentiment = {}
+    batches = {}
+    failures = {}
+    info_sent = False
+    for source, source_posts, cut_short, failure in sources:
+        posts[source] = source_posts
+        if cut_short:
+            timed_out.append(source)
+        if failure:
+            failures[source] = failure
+        # Keep the per-text scores so they can be stored, not just the average
+        with span('pipeline.score', source=source, texts=len(source_posts)):
+            batches[source] = get_engine().score_batch(source_posts)
+        source_sentiment[source] = batches[source].score()
+        yield 'sentiment', {
+            'source': source,
+            'posts': source_posts,
+            'score': source_sentiment[source],
+            'timed_out': cut_short,
+            'failure': failure
+        }
+        if info is not None and not info_sent and info.done():
+            info_sent = True
+            yield 'info', info.result()
+
+    profile = info.result() if info is not None else {}
+    if not info_sent:
+        yield 'info', profile
+    # Wall time of the whole run, including the caller's work between events
+    record('pipeline.analysis', time.perf_counter() - started, ticker=ticker, timeframe=timeframe)
+    yield 'snapshot', AnalysisSnapshot(
+        ticker, timeframe, hist, indicators,
+        {source: posts[source] for source in SENTIMENT_SOURCES},
+        [source for source in SENTIMENT_SOURCES if source in timed_out],
+        source_sentiment, profile, datetime.now(), batches, failures
+    )
+
+def build_snapshot(ticker, timeframe='1M', include_info=True, clients=None, store=None):
+    """Fetch prices, posts and company info for a ticker and score them."""
+    for stage, value in iter_analysis(ticker, timeframe, include_info, clients, store):
+        if stage == 'snapshot':
+            return value
+
+# Snapshots shared by every session in the server process
+snapshot_cache = TTLCache(max_entries=256)
+register_stats('snapshot_cache', snapshot_cache.stats)
+
+class _StreamFlight:
+    """One iter_analysis() run whose events any number of callers replay as they arrive."""
+
+    def __init__(self):
+        self.events = []
+        self.finished = False
+        self.error = None
+        self._changed = threading.Condition()
+
+    def publish(self, event):
+        with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def finish(self, error=None):
+        with self._changed:
+            self.finished = True
+            self.error = error
+            self._changed.notify_all()
+
+    def replay(self):
+        """Yield every event so far, then each new one, raising the run's exception at the end."""
+        seen = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: len(self.events) > seen or self.finished)
+                pending = self.events[seen:]
+                finished, error = self.finished, self.error
+            yield from pending
+            seen += len(pending)
+            if finished:
+                if error is not None:
+                    raise error
+                return
+
+# Analysis runs in progress, by (ticker, timeframe)
+_stream_flights = {}
+_stream_flights_lock = threading.Lock()
+
+def _run_stream(key, flight, ttl):
+    ticker, timeframe = key
+    try:
+        for stage, value in iter_analysis(ticker, timeframe):
+            if stage == 'snapshot':
+                with _stream_flights_lock:
+                    # A run detached by invalidate_snapshot() must not cache its older result
+                    if _stream_flights.get(key) is flight:
+                        snapshot_cache.set(key, value, ttl)
+            flight.publish((stage, value))
+        failure = None
+    except Exception as e:
+        failure = e
+    # Unregister before finishing, so later callers find the cached snapshot instead
+    with _stream_flights_lock:
+        if _stream_flights.get(key) is flight:
+            del _stream_flights[key]
+    flight.finish(failure)
+
+def stream_snapshot(ticker, timeframe='1M', ttl=SNAPSHOT_TTL):
+    """Like iter_analysis(), but replays a cached snapshot and caches a new one.
+
+    A fresh snapshot is replayed instantly. Otherwise one pipeline run is
+    started in the background per (ticker, timeframe), and every caller
+    that arrives while it is in progress replays the stages finished so
+    far and then the rest as they complete. A caller that stops reading
+    does not stop the run, whose snapshot is cached for later reruns and
+    sessions.
+    """
+    key = (ticker.upper(), timeframe)
+    with _stream_flights_lock:
+        snapshot = snapshot_cache.get(key)
+        flight = _stream_flights.get(key)
+        if snapshot is None and flight is None:
+            flight = _stream_flights[key] = _StreamFlight()
+            submit(_stream_executor, _run_stream, key, flight, ttl)
+        elif snapshot is None:
+            count('pipeline.stream_shared')
+    if snapshot is not None:
+        yield from snapshot.events()
+    else:
+        yield from flight.replay()
+
+def get_snapshot(ticker, timeframe='1M', ttl=SNAPSHOT_TTL):
+    """Return a cached snapshot, building it once for concurrent callers when missing or stale."""
+    for stage, value in stream_snapshot(ticker, timeframe, ttl):
+        if stage == 'snapshot':
+            return value
+
+def invalidate_snapshot(ticker=None):
+    """Drop cached snapshots and fetched posts for one ticker, or for every ticker.
+
+    Runs already in progress finish for the callers replaying them, but
+    later callers start a new one.
+    """
+    ticker = ticker.upper() if ticker is not None else None
+    with _stream_flights_lock:
+        for key in [key for key in _stream_flights if ticker is None or key[0] == ticker]:
+            del _stream_flights[key]
+    if ticker is None:
+        snapshot_cache.invalidate()
+        invalidate_fetch_cache()
+    else:
+        snapshot_cache.invalidate(lambda key: key[0] == ticker)
+        invalidate_fetch_cache(ticker)
+
+def analyze_ticker(ticker, timeframe='1M'):
+    """Fetch and score one ticker without company info, as the watchlist worker needs."""
+    return build_snapshot(ticker, timeframe, include_info=False).analysis()
@@ -0,0 +1,275 @@
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from dotenv import load_dotenv
+from instrumentation import span, error
+
+# Load environment variables
+load_dotenv()
+
+PRICE_STORE_PATH = os.getenv('PRICE_STORE_PATH', './price_history.db')
+
+# Columns stored for every daily bar
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Corporate-action columns returned alongside the bars; a non-zero value
+# means every earlier adjusted bar has been rescaled by the provider
+ACTION_COLUMNS = ['Dividends', 'Stock Splits']
+
+# yfinance periods measured in trading days rather than calendar time
+_BAR_PERIODS = {'1d': 1, '5d': 5}
+
+_CALENDAR_PERIODS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10)
+}
+
+def yfinance_provider(ticker, start=None, period=None):
+    """Download split- and dividend-adjusted daily bars from yfinance, either since start or for a period."""
+    import yfinance as yf
+    stock = yf.Ticker(ticker)
+    if start is not None:
+        return stock.history(start=start, interval='1d', auto_adjust=True, actions=True)
+    return stock.history(period=period, interval='1d', auto_adjust=True, actions=True)
+
+def _utc_nanos(bars):
+    """The bars' timestamps as UTC nanoseconds; a naive index is taken to be UTC."""
+    index = pd.DatetimeIndex(bars.index)
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.tz_convert('UTC').as_unit('ns').asi8
+
+def _latest_action(bars):
+    """Timestamp (UTC nanoseconds) of the newest dividend or split in bars, or None."""
+    if bars is None or bars.empty:
+        return None
+    columns = [column for column in ACTION_COLUMNS if column in bars.columns]
+    if not columns:
+        return None
+    has_action = (bars[columns].fillna(0) != 0).any(axis=1).to_numpy()
+    if not has_action.any():
+        return None
+    return int(_utc_nanos(bars)[has_action][-1])
+
+def _period_start(period, now):
+    """Earliest timestamp a calendar period covers, or None for bar-count periods."""
+    if period in _BAR_PERIODS:
+        return None
+    if period == 'max':
+        return pd.Timestamp.min.tz_localize('UTC')
+    if period not in _CALENDAR_PERIODS:
+        raise ValueError(f"Unsupported period: {period}")
+    return now - _CALENDAR_PERIODS[period]
+
+class PriceStore:
+    """Local daily OHLCV history per ticker, topped up incrementally.
+
+    Bars live in a SQLite table keyed by (ticker, timestamp). A request
+    downloads only what is missing: the full period the first time, and
+    afterwards just the bars since the newest stored one (re-fetching that
+    bar, which may have been partial). Bars are adjusted for splits and
+    dividends, so when a top-up reports an action newer than the last one
+    seen, the whole stored range is downloaded again. If the provider
+    fails, e.g. offline, the stored bars are served as they are.
+    """
+
+    def __init__(self, path=PRICE_STORE_PATH, provider=yfinance_provider, refresh_seconds=60):
+        self.path = path
+        self.provider = provider
+        self.refresh_seconds = refresh_seconds
+        self._local = threading.local()
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS price_bars ("
+            "ticker TEXT NOT NULL, ts INTEGER NOT NULL, "
+            "open REAL, high REAL, low REAL, close REAL, volume REAL, "
+            "PRIMARY KEY (ticker, ts))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS price_meta ("
+            "ticker TEXT PRIMARY KEY, covered_from INTEGER, fetched_at REAL, tz TEXT, "
+            "actions_through INTEGER)"
+        )
+        # Stores created before actions were tracked
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(price_meta)")]
+        if 'actions_through' not in columns:
+            conn.execute("ALTER TABLE price_meta ADD COLUMN actions_through INTEGER")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _ticker_lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _meta(self, ticker):
+        return self._connection().execute(
+            "SELECT covered_from, fetched_at, tz, actions_through FROM price_meta WHERE ticker = ?", (ticker,)
+        ).fetchone()
+
+    def _last_timestamp(self, ticker):
+        row = self._connection().execute(
+            "SELECT MAX(ts) FROM price_bars WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        return row[0]
+
+    def _first_timestamp(self, ticker):
+        row = self._connection().execute(
+            "SELECT MIN(ts) FROM price_bars WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        return row[0]
+
+    def _write(self, ticker, bars, covered_from, replace=False):
+        """Upsert downloaded bars and record what the store now covers.
+
+        With replace, the ticker's stored bars are dropped first, so bars
+        adjusted before a split or dividend cannot survive alongside the
+        re-downloaded ones.
+        """
+        conn = self._connection()
+        rows = []
+        tz = None
+        if bars is not None and not bars.empty:
+            index = pd.DatetimeIndex(bars.index)
+            if index.tz is not None:
+                tz = str(index.tz)
+            rows = zip(
+                [ticker] * len(bars),
+                _utc_nanos(bars).tolist(),
+                *(bars[column].astype(float).tolist() for column in BAR_COLUMNS)
+            )
+        conn.execute("BEGIN")
+        try:
+            if replace:
+                conn.execute("DELETE FROM price_bars WHERE ticker = ?", (ticker,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO price_bars (ticker, ts, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT INTO price_meta (ticker, covered_from, fetched_at, tz, actions_through) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(ticker) DO UPDATE SET "
+                "covered_from = MIN(COALESCE(covered_from, excluded.covered_from), excluded.covered_from), "
+                "fetched_at = excluded.fetched_at, tz = COALESCE(excluded.tz, tz), "
+                "actions_through = COALESCE(MAX(actions_through, excluded.actions_through), "
+                "actions_through, excluded.actions_through)",
+                (ticker, covered_from, time.time(), tz, _latest_action(bars))
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _top_up(self, ticker, period, now):
+        start = _period_start(period, now)
+        meta = self._meta(ticker)
+        last_ts = self._last_timestamp(ticker)
+        needs_backfill = (
+            meta is None or last_ts is None
+            or (start is not None and (meta[0] is None or meta[0] > start.value))
+            or (start is None and self._bar_count(ticker) < _BAR_PERIODS[period])
+        )
+
+        if needs_backfill:
+            with span('prices.provider', ticker=ticker, period=period):
+                bars = self.provider(ticker, period=period)
+            if bars is None or bars.empty:
+                return
+            covered_from = start.value if start is not None else int(bars.index[0].value)
+            self._write(ticker, bars, covered_from)
+        elif time.time() - meta[1] >= self.refresh_seconds:
+            # Re-fetch from the newest stored bar, which may have been partial
+            since = pd.Timestamp(last_ts, tz='UTC')
+            if meta[2]:
+                since = since.tz_convert(meta[2])
+            with span('prices.provider', ticker=ticker, since=since.strftime('%Y-%m-%d')):
+                bars = self.provider(ticker, start=since.strftime('%Y-%m-%d'))
+            action = _latest_action(bars)
+            if action is None or (meta[3] is not None and action <= meta[3]):
+                self._write(ticker, bars, meta[0])
+                return
+            # A new split or dividend rescaled every stored bar; download them all again
+            first = pd.Timestamp(self._first_timestamp(ticker), tz='UTC')
+            if meta[2]:
+                first = first.tz_convert(meta[2])
+            with span('prices.provider', ticker=ticker, since=first.strftime('%Y-%m-%d'), reason='actions'):
+                history = self.provider(ticker, start=first.strftime('%Y-%m-%d'))
+            # Without a fresh copy nothing is recorded, so the next refresh retries
+            if history is not None and not history.empty:
+                self._write(ticker, history, meta[0], replace=True)
+
+    def _bar_count(self, ticker):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM price_bars WHERE ticker = ?", (ticker,)
+        ).fetchone()[0]
+
+    def get_history(self, ticker, period='1y'):
+        """Return daily OHLCV bars for a yfinance-style period ('1d', '5d', '1mo', ... 'max')."""
+        ticker = ticker.upper()
+        now = pd.Timestamp.now(tz='UTC')
+        with self._ticker_lock(ticker):
+            try:
+                self._top_up(ticker, period, now)
+            except Exception as e:
+                print(f"Error updating price history for {ticker}: {e}")
+                error('prices.provider', e, ticker=ticker)
+            return self.read(ticker, period, now)
+
+    def read(self, ticker, period='max', now=None):
+        """Return stored bars for a period without contacting the provider."""
+        ticker = ticker.upper()
+        start = _period_start(period, now or pd.Timestamp.now(tz='UTC'))
+        query = "SELECT ts, open, high, low, close, volume FROM price_bars WHERE ticker = ?"
+        params = [ticker]
+        if start is not None and period != 'max':
+            query += " AND ts >= ?"
+            params.append(start.value)
+        query += " ORDER BY ts"
+        rows = self._connection().execute(query, params).fetchall()
+
+        meta = self._meta(ticker)
+        frame = pd.DataFrame(rows, columns=['ts'] + BAR_COLUMNS)
+        index = pd.to_datetime(frame.pop('ts'), utc=True)
+        if meta is not None and meta[2]:
+            index = index.dt.tz_convert(meta[2])
+        frame.index = pd.DatetimeIndex(index, name='Date')
+        if not frame['Volume'].isna().any():
+            frame['Volume'] = frame['Volume'].astype('int64')
+        if start is None:
+            frame = frame.tail(_BAR_PERIODS[period])
+        return frame
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_price_store():
+    """Return the shared PriceStore, creating it once even when first called from several threads."""
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore()
+    return _store
+
+def get_history(ticker, period='1y'):
+    """Daily OHLCV history for a ticker, served from the local store."""
+    return get_price_store().get_history(ticker, period)
@@ -1,57 +1,231 @@
-from textblob import TextBlob
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
+import numpy as np
+import os
 import re
+import threading
+from functools import lru_cache
+from instrumentation import span, count, register_stats
+from sentiment_cache import SentimentCache
 
-# Download required NLTK data
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
-
-def clean_text(text):
-    """Clean and preprocess text for sentiment analysis."""
-    # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    # Remove special characters and numbers
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\d+', '', text)
-    # Convert to lowercase
-    text = text.lower()
-    return text
+# Checked once per process; offline installs can point NLTK_DATA at a
+# directory prepared with `python -m nltk.downloader -d <dir> vader_lexicon`
+_lexicon_lock = threading.Lock()
+_lexicon_checked = False
+
+def ensure_vader_lexicon():
+    """Make sure the VADER lexicon is installed, downloading it at most once per process."""
+    global _lexicon_checked
+    with _lexicon_lock:
+        if _lexicon_checked:
+            return
+        import nltk
+        try:
+            nltk.data.find('sentiment/vader_lexicon.zip')
+        except LookupError:
+            nltk.download('vader_lexicon', quiet=True)
+        _lexicon_checked = True
+
+# Weights for combining the two scorers (VADER is generally more accurate for social media)
+VADER_WEIGHT = 0.7
+TEXTBLOB_WEIGHT = 0.3
+
+# Bump whenever scoring changes so cached scores are not reused. Cache keys
+# are built from the cleaned text, so cleaning options need no bump.
+SCORER_VERSION = 'vader-pattern-1'
+
+# Keep $cashtags, and emoji plus the emoticons VADER's lexicon scores, when cleaning
+KEEP_CASHTAGS = os.getenv('SENTIMENT_KEEP_CASHTAGS', '').lower() in ('1', 'true', 'yes')
+KEEP_EMOJI = os.getenv('SENTIMENT_KEEP_EMOJI', '').lower() in ('1', 'true', 'yes')
+
+# Distinct texts whose cleaned form is remembered
+CLEAN_CACHE_SIZE = 65536
+
+# URLs, then any single character that is not a word character or
+# whitespace, or is a digit: one pass removes what the URL, punctuation
+# and digit substitutions used to remove in three
+_STRIP = r'http\S+|www\S+|[^\w\s]|\d'
+_STRIP_PATTERN = re.compile(_STRIP)
+
+_CASHTAG = r'\$[A-Za-z]{1,6}(?:\.[A-Za-z])?(?![\w$])'
+_EMOJI = r'(?:[\u2600-\u27bf\u2b50\u2b55\U0001f000-\U0001faff]\ufe0f?\u200d?)+'
+# Common emoticons from the VADER lexicon, longest first so ':-))' wins over ':-)'
+_EMOTICONS = sorted([
+    ':)', ':-)', ':))', ':-))', ':(', ':-(', ':D', ':-D', ';)', ';-)', ':P', ':-P',
+    ":'(", ":')", ':/', ':-/', ':|', ':-|', ':O', ':-o', ':*', ':-*', ':]', ':[', ':-[',
+    '=)', '=D', '=/', '=|', '>:(', '>:)', '(:', ':^)', '<3', '</3'
+], key=len, reverse=True)
+_EMOTICON = '(?:' + '|'.join(re.escape(emoticon) for emoticon in _EMOTICONS) + r')(?!\w)'
+
+def _keep_pattern(keep_cashtags, keep_emoji):
+    """_STRIP with the tokens to preserve matched first, whole, in a 'keep' group."""
+    keep = ([_CASHTAG] if keep_cashtags else []) + ([_EMOTICON, _EMOJI] if keep_emoji else [])
+    return re.compile(f"(?P<keep>{'|'.join(keep)})|{_STRIP}")
+
+_KEEP_PATTERNS = {
+    (keep_cashtags, keep_emoji): _keep_pattern(keep_cashtags, keep_emoji)
+    for keep_cashtags in (False, True) for keep_emoji in (False, True)
+    if keep_cashtags or keep_emoji
+}
+
+def _kept(match):
+    return match.group('keep') or ''
+
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def clean_text(text, keep_cashtags=False, keep_emoji=False):
+    """Clean and preprocess text for sentiment analysis.
+
+    Strips URLs, punctuation and digits and lowercases the rest in one
+    precompiled pass. keep_cashtags keeps tokens like $TSLA and keep_emoji
+    keeps emoji and common emoticons such as :) that VADER scores. Results
+    are memoized per input.
+    """
+    if keep_cashtags or keep_emoji:
+        return _KEEP_PATTERNS[(keep_cashtags, keep_emoji)].sub(_kept, text).lower()
+    return _STRIP_PATTERN.sub('', text).lower()
+
+class SentimentBatch:
+    """Per-text sentiment scores for a batch of texts."""
+
+    def __init__(self, vader, textblob):
+        self.vader = vader
+        self.textblob = textblob
+        self.compound = vader * VADER_WEIGHT + textblob * TEXTBLOB_WEIGHT
+
+    def __len__(self):
+        return len(self.vader)
+
+    def score(self):
+        """Weighted average sentiment over the whole batch."""
+        if len(self) == 0:
+            return 0.0
+        return float(self.vader.mean() * VADER_WEIGHT + self.textblob.mean() * TEXTBLOB_WEIGHT)
+
+    def breakdown(self):
+        """Percentage of positive, neutral and negative texts by VADER compound."""
+        return _breakdown(self.vader)
+
+def _breakdown(vader):
+    total = len(vader)
+    if total == 0:
+        return {'positive': 0, 'neutral': 0, 'negative': 0}
+    positive = int(np.count_nonzero(vader >= 0.05))
+    negative = int(np.count_nonzero(vader <= -0.05))
+    return {
+        'positive': (positive / total) * 100,
+        'neutral': ((total - positive - negative) / total) * 100,
+        'negative': (negative / total) * 100
+    }
+
+class SentimentEngine:
+    """Scores batches of texts with models that are loaded once and reused."""
+
+    def __init__(self, cache=None, keep_cashtags=KEEP_CASHTAGS, keep_emoji=KEEP_EMOJI):
+        # nltk and textblob take a noticeable share of startup, so they load here
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        from textblob.sentiments import PatternAnalyzer
+        ensure_vader_lexicon()
+        self.sia = SentimentIntensityAnalyzer()
+        self.pattern = PatternAnalyzer()
+        self.cache = cache
+        self.keep_cashtags = keep_cashtags
+        self.keep_emoji = keep_emoji
+
+    def score_text(self, cleaned_text):
+        """Return (vader, textblob) scores for one already-cleaned text."""
+        vader_score = self.sia.polarity_scores(cleaned_text)['compound']
+        textblob_score = self.pattern.analyze(cleaned_text).polarity
+        return vader_score, textblob_score
+
+    def _positions(self, texts):
+        # Texts that clean to the same string are only scored once
+        with span('sentiment.clean', texts=len(texts)):
+            positions = {}
+            for i, text in enumerate(texts):
+                positions.setdefault(clean_text(text, self.keep_cashtags, self.keep_emoji), []).append(i)
+        return positions
+
+    def _cached(self, positions):
+        # Cache keys and the (vader, textblob) scores already cached, by cleaned text
+        if self.cache is None:
+            return None, {}
+        scored = {}
+        with span('sentiment.cache_lookup', texts=len(positions)):
+            keys = {cleaned_text: self.cache.key(cleaned_text) for cleaned_text in positions}
+            cached = self.cache.get_many(list(keys.values()))
+            for cleaned_text, key in keys.items():
+                scores = cached.get(key)
+                if scores is not None:
+                    scored[cleaned_text] = scores
+        return keys, scored
+
+    def score_batch(self, texts):
+        """Score a list of texts and return a SentimentBatch."""
+        n = len(texts)
+        vader = np.empty(n, dtype=np.float64)
+        textblob = np.empty(n, dtype=np.float64)
+
+        positions = self._positions(texts)
+        keys, scored = self._cached(positions)
+        missing = [cleaned_text for cleaned_text in positions if cleaned_text not in scored]
+
+        # VADER and TextBlob only see texts that are neither duplicates nor cached
+        with span('sentiment.model', texts=len(missing)):
+            fresh = {cleaned_text: self.score_text(cleaned_text) for cleaned_text in missing}
+        scored.update(fresh)
+        if keys is not None:
+            self.cache.put_many({keys[cleaned_text]: scores for cleaned_text, scores in fresh.items()})
+        count('sentiment.texts', n)
+        count('sentiment.duplicates', n - len(positions))
+        count('sentiment.cache_hits', len(positions) - len(missing))
+        count('sentiment.model_scored', len(missing))
+
+        for cleaned_text, indices in positions.items():
+            vader[indices], textblob[indices] = scored[cleaned_text]
+
+        return SentimentBatch(vader, textblob)
+
+    def score_vader(self, texts):
+        """VADER compound scores for a list of texts, skipping TextBlob.
+
+        Cached scores are reused; texts that are not cached are scored by
+        VADER alone and not added to the cache, which holds both models.
+        """
+        vader = np.empty(len(texts), dtype=np.float64)
+        positions = self._positions(texts)
+        _, scored = self._cached(positions)
+        with span('sentiment.model', texts=len(positions) - len(scored), models='vader'):
+            for cleaned_text, indices in positions.items():
+                scores = scored.get(cleaned_text)
+                vader[indices] = scores[0] if scores is not None else self.sia.polarity_scores(cleaned_text)['compound']
+        return vader
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the shared SentimentEngine, creating it once even when first called from several threads."""
+    global _engine
+    if _engine is not None:
+        return _engine
+    with _engine_lock:
+        if _engine is None:
+            cache = SentimentCache(
+                SCORER_VERSION,
+                max_entries=int(os.getenv('SENTIMENT_CACHE_SIZE', '100000')),
+                path=os.getenv('SENTIMENT_CACHE_PATH')
+            )
+            # Loading nltk, textblob and the lexicon is a one-off cost worth seeing
+            with span('sentiment.engine_init'):
+                _engine = SentimentEngine(cache=cache)
+    return _engine
+
+# Read the cache counters without creating the engine
+register_stats('sentiment_cache', lambda: _engine.cache.stats() if _engine is not None and _engine.cache else {})
 
 def analyze_sentiment(texts):
     """Analyze sentiment of a list of texts using multiple methods."""
     if not texts:
         return 0.0
-    
-    # Initialize sentiment analyzers
-    sia = SentimentIntensityAnalyzer()
-    
-    # Calculate sentiment scores
-    vader_scores = []
-    textblob_scores = []
-    
-    for text in texts:
-        # Clean the text
-        cleaned_text = clean_text(text)
-        
-        # VADER sentiment analysis
-        vader_score = sia.polarity_scores(cleaned_text)['compound']
-        vader_scores.append(vader_score)
-        
-        # TextBlob sentiment analysis
-        blob = TextBlob(cleaned_text)
-        textblob_scores.append(blob.sentiment.polarity)
-    
-    # Combine scores (weighted average)
-    vader_avg = sum(vader_scores) / len(vader_scores) if vader_scores else 0
-    textblob_avg = sum(textblob_scores) / len(textblob_scores) if textblob_scores else 0
-    
-    # Weighted average (VADER is generally more accurate for social media)
-    final_score = (vader_avg * 0.7) + (textblob_avg * 0.3)
-    
-    return final_score
+    return get_engine().score_batch(texts).score()
 
 def get_sentiment_label(score):
     """Convert sentiment score to label."""
@@ -70,48 +244,23 @@ def analyze_sentiment_trend(texts, timestamps):
     """Analyze sentiment trend over time."""
     if not texts or not timestamps:
         return []
-    
+
     # Sort texts and timestamps
     sorted_data = sorted(zip(timestamps, texts))
     timestamps, texts = zip(*sorted_data)
-    
-    # Calculate sentiment for each time period
-    sentiments = []
-    for text in texts:
-        sentiment = analyze_sentiment([text])
-        sentiments.append(sentiment)
-    
-    return list(zip(timestamps, sentiments))
-
-def get_sentiment_breakdown(texts):
-    """Get detailed sentiment breakdown."""
-    sia = SentimentIntensityAnalyzer()
-    
-    # Initialize counters
-    sentiment_counts = {
-        'positive': 0,
-        'neutral': 0,
-        'negative': 0
-    }
-    
-    # Analyze each text
-    for text in texts:
-        cleaned_text = clean_text(text)
-        scores = sia.polarity_scores(cleaned_text)
-        
-        if scores['compound'] >= 0.05:
-            sentiment_counts['positive'] += 1
-        elif scores['compound'] <= -0.05:
-            sentiment_counts['negative'] += 1
-        else:
-            sentiment_counts['neutral'] += 1
-    
-    # Calculate percentages
-    total = len(texts)
-    if total > 0:
-        return {
-            'positive': (sentiment_counts['positive'] / total) * 100,
-            'neutral': (sentiment_counts['neutral'] / total) * 100,
-            'negative': (sentiment_counts['negative'] / total) * 100
-        }
-    return {'positive': 0, 'neutral': 0, 'negative': 0}
+
+    # Score every text in one batch; each text's combined score is its sentiment
+    batch = get_engine().score_batch(texts)
+    return list(zip(timestamps, batch.compound.tolist()))
+
+def get_sentiment_breakdown(texts, batch=None):
+    """Get detailed sentiment breakdown.
+
+    The breakdown only needs VADER, so TextBlob is skipped; pass the
+    SentimentBatch already scored for these texts as batch to reuse it.
+    """
+    if batch is not None:
+        return batch.breakdown()
+    if not texts:
+        return {'positive': 0, 'neutral': 0, 'negative': 0}
+    return _breakdown(get_engine().score_vader(texts))
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+import hashlib
+import sqlite3
+import threading
+
+# SQLite limits the number of bound parameters per statement
+_SQLITE_BATCH = 500
+
+def content_hash(text):
+    """Stable hex digest of a piece of text."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+class SentimentCache:
+    """Two-tier cache of (vader, textblob) scores keyed by cleaned text.
+
+    Keys combine the scorer version with a hash of the cleaned text, so
+    changing the scorer or the cleaning invalidates old entries. The memory
+    tier is a bounded LRU; the optional disk tier is a SQLite file that can
+    be shared by every Streamlit session and worker process on the host.
+    """
+
+    def __init__(self, version, max_entries=100000, path=None):
+        self.version = version
+        self.max_entries = max_entries
+        self.path = path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                "key TEXT PRIMARY KEY, vader REAL NOT NULL, textblob REAL NOT NULL)"
+            )
+
+    def key(self, cleaned_text):
+        """Cache key for an already-cleaned text."""
+        return content_hash(f"{self.version}\x00{cleaned_text}")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, scores):
+        self._memory[key] = scores
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """Return a dict of key -> (vader, textblob) for the keys that are cached."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                scores = self._memory.get(key)
+                if scores is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = scores
+            self.memory_hits += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.path:
+            from_disk = {}
+            conn = self._connection()
+            for i in range(0, len(missing), _SQLITE_BATCH):
+                chunk = missing[i:i + _SQLITE_BATCH]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, vader, textblob FROM sentiment_cache WHERE key IN ({placeholders})",
+                    chunk
+                )
+                for key, vader, textblob in rows:
+                    from_disk[key] = (vader, textblob)
+            with self._lock:
+                for key, scores in from_disk.items():
+                    self._remember(key, scores)
+                self.disk_hits += len(from_disk)
+            found.update(from_disk)
+
+        with self._lock:
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Store a dict of key -> (vader, textblob) in every tier."""
+        if not items:
+            return
+        with self._lock:
+            for key, scores in items.items():
+                self._remember(key, scores)
+        if self.path:
+            conn = self._connection()
+            try:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sentiment_cache (key, vader, textblob) VALUES (?, ?, ?)",
+                    [(key, vader, textblob) for key, (vader, textblob) in items.items()]
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                print(f"Error writing sentiment cache: {e}")
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+
+    def clear(self):
+        """Drop every cached entry and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+        if self.path:
+            self._connection().execute("DELETE FROM sentiment_cache")
+
+    def stats(self):
+        """Hit/miss counters for the cache."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory)
+            }
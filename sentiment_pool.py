@@ -0,0 +1,68 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+from sentiment_analysis import SentimentBatch, SentimentEngine
+
+# Number of texts sent to a worker at a time
+DEFAULT_CHUNK_SIZE = 2000
+
+# Each worker process builds its own engine once, at startup
+_worker_engine = None
+
+def _init_worker():
+    global _worker_engine
+    _worker_engine = SentimentEngine()
+
+def _score_chunk(texts):
+    """Score one chunk in a worker and return a (2, n) float64 array."""
+    batch = _worker_engine.score_batch(texts)
+    return np.stack([batch.vader, batch.textblob])
+
+class SentimentPool:
+    """Process pool that scores large corpora across all available cores.
+
+    Results are identical to the serial SentimentEngine since every worker
+    runs the same engine and the per-text scores are returned unrounded.
+    """
+
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes."""
+        self._executor.shutdown()
+
+    def score_batch(self, texts):
+        """Score a list of texts in parallel and return a SentimentBatch."""
+        texts = list(texts)
+        if not texts:
+            empty = np.empty(0, dtype=np.float64)
+            return SentimentBatch(empty, empty.copy())
+
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        scores = np.concatenate(list(self._executor.map(_score_chunk, chunks)), axis=1)
+        return SentimentBatch(scores[0], scores[1])
+
+    def analyze_sentiment(self, texts):
+        """Parallel equivalent of sentiment_analysis.analyze_sentiment."""
+        if not texts:
+            return 0.0
+        return self.score_batch(texts).score()
+
+def score_parallel(texts, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score texts with a temporary SentimentPool."""
+    with SentimentPool(workers=workers, chunk_size=chunk_size) as pool:
+        return pool.score_batch(texts)
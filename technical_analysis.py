@@ -1,47 +1,379 @@
+import math
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from instrumentation import span
 
-def calculate_technical_indicators(df):
-    """Calculate various technical indicators for the given price data."""
-    indicators = {}
-    
-    # Simple Moving Averages
-    indicators['SMA_20'] = df['Close'].rolling(window=20).mean()
-    indicators['SMA_50'] = df['Close'].rolling(window=50).mean()
-    indicators['SMA_200'] = df['Close'].rolling(window=200).mean()
-    
-    # Exponential Moving Averages
-    indicators['EMA_12'] = df['Close'].ewm(span=12, adjust=False).mean()
-    indicators['EMA_26'] = df['Close'].ewm(span=26, adjust=False).mean()
-    
-    # MACD
-    indicators['MACD'] = indicators['EMA_12'] - indicators['EMA_26']
-    indicators['MACD_Signal'] = indicators['MACD'].ewm(span=9, adjust=False).mean()
-    indicators['MACD_Hist'] = indicators['MACD'] - indicators['MACD_Signal']
-    
-    # RSI
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    indicators['RSI'] = 100 - (100 / (1 + rs))
-    
-    # Bollinger Bands
-    indicators['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    bb_std = df['Close'].rolling(window=20).std()
-    indicators['BB_Upper'] = indicators['BB_Middle'] + (bb_std * 2)
-    indicators['BB_Lower'] = indicators['BB_Middle'] - (bb_std * 2)
-    
-    # Volume indicators
-    indicators['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
-    indicators['Volume_Ratio'] = df['Volume'] / indicators['Volume_SMA']
-    
-    # ATR (Average True Range)
-    high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift())
-    low_close = np.abs(df['Low'] - df['Close'].shift())
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = np.max(ranges, axis=1)
-    indicators['ATR'] = true_range.rolling(14).mean()
-    
-    return indicators 
\ No newline at end of file
+# Every indicator calculate_technical_indicators returns, in block column order
+INDICATOR_NAMES = [
+    'SMA_20', 'SMA_50', 'SMA_200', 'EMA_12', 'EMA_26',
+    'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI',
+    'BB_Middle', 'BB_Upper', 'BB_Lower',
+    'Volume_SMA', 'Volume_Ratio', 'ATR'
+]
+
+# Upper bound on elements materialized at once by the rolling std
+_STD_CHUNK_ELEMENTS = 1 << 16
+
+# Rows per block of running sums; windows up to this length reuse them
+_PREFIX_BLOCK = 2048
+
+class _WindowSums:
+    """NaN-aware prefix sums of a series, shared by every window length over it.
+
+    The running sums restart every _PREFIX_BLOCK rows so their rounding error
+    stays proportional to one block rather than to the whole history.
+    """
+
+    def __init__(self, x):
+        valid = ~np.isnan(x)
+        self.complete = bool(valid.all())
+        self.values = x if self.complete else np.where(valid, x, 0.0)
+        self.sums = np.empty((len(x) + 1,) + x.shape[1:])
+        self.sums[0] = 0.0
+        for start in range(0, len(x), _PREFIX_BLOCK):
+            stop = start + _PREFIX_BLOCK
+            np.cumsum(self.values[start:stop], axis=0, out=self.sums[start + 1:stop + 1])
+        if not self.complete:
+            self.counts = np.zeros((len(x) + 1,) + x.shape[1:], dtype=np.int64)
+            np.cumsum(valid, axis=0, out=self.counts[1:])
+
+    def mean(self, window, out):
+        """Trailing-window mean along axis 0, NaN until the window holds no missing values."""
+        n = len(out)
+        out[:window - 1] = np.nan
+        if n < window:
+            return out
+        tail = out[window - 1:]
+        if window > _PREFIX_BLOCK:
+            # Rare long windows fall back to one running sum over the whole history
+            sums = np.concatenate([self.sums[:1], np.cumsum(self.values, axis=0)])
+            np.subtract(sums[window:], sums[:-window], out=tail)
+        else:
+            # Row t of tail covers rows t .. t + window - 1 of the series
+            np.subtract(self.sums[window:], self.sums[:n - window + 1], out=tail)
+            for block_start in range(0, n - window + 1, _PREFIX_BLOCK):
+                # The sums restart here, so nothing before the window should be subtracted
+                tail[block_start] += self.sums[block_start]
+            for block_start in range(_PREFIX_BLOCK, n, _PREFIX_BLOCK):
+                # Windows straddling a restart also need the previous block's total
+                first = max(0, block_start - window + 1)
+                tail[first:block_start] += self.sums[block_start]
+        tail /= window
+        if not self.complete:
+            tail[(self.counts[window:] - self.counts[:-window]) < window] = np.nan
+        return out
+
+def _rolling_std(x, window, mean, out):
+    """Trailing-window sample standard deviation around an already computed rolling mean."""
+    out[:window - 1] = np.nan
+    if len(x) < window:
+        return out
+    windows = sliding_window_view(x, window, axis=0)
+    centers = mean[window - 1:, ..., np.newaxis]
+    tail = out[window - 1:]
+    step = max(1, _STD_CHUNK_ELEMENTS // windows[0].size)
+    for start in range(0, len(windows), step):
+        stop = start + step
+        deviations = windows[start:stop] - centers[start:stop]
+        np.square(deviations, out=deviations)
+        np.sum(deviations, axis=-1, out=tail[start:stop])
+    tail /= window - 1
+    np.sqrt(tail, out=tail)
+    return out
+
+def _ema(x, span, out):
+    """Exponential moving average along axis 0, as ewm(span, adjust=False).mean()."""
+    frame = pd.DataFrame(x.reshape(len(x), -1))
+    out[...] = frame.ewm(span=span, adjust=False).mean().to_numpy().reshape(x.shape)
+    return out
+
+# Indicator registry
+class IndicatorSpec:
+    """How to compute one family of indicators.
+
+    ``params`` is a sequence of (name, default) pairs; a default of None
+    makes the parameter required. Values are taken positionally from the
+    numeric suffix of a requested name, so ``RSI_21`` is RSI with window 21
+    and ``BB_Upper_20_2.5`` is an upper band 2.5 deviations wide.
+    ``depends(**params)`` returns the names of the nodes this indicator
+    reads, which are computed first and passed to ``compute`` positionally.
+    ``compute(out, *deps, **params)`` fills ``out`` (an array shaped like
+    the input series) or, when ``array`` is False, returns a reusable
+    intermediate such as a set of prefix sums. Window and span parameters
+    must be whole numbers of at least ``minimum`` bars; only the parameters
+    in FRACTIONAL_PARAMS may be fractional.
+    """
+
+    def __init__(self, compute, params=(), depends=None, array=True, minimum=1):
+        self.compute = compute
+        self.params = tuple(params)
+        self.depends = depends or (lambda **params: [])
+        self.array = array
+        self.minimum = minimum
+
+INDICATORS = {}
+
+# Raw input series every indicator is ultimately computed from
+INPUT_SERIES = ('Close', 'High', 'Low', 'Volume')
+
+# Parameters that are multipliers rather than bar counts
+FRACTIONAL_PARAMS = ('width',)
+
+def register_indicator(family, compute, params=(), depends=None, array=True, minimum=1):
+    """Add an indicator family to the registry (see IndicatorSpec)."""
+    INDICATORS[family] = IndicatorSpec(compute, params, depends, array, minimum)
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+def _parse_indicator(name):
+    """Split a requested name into (family, params) with defaults filled in."""
+    parts = name.split('_')
+    args = []
+    while len(parts) > 1:
+        try:
+            args.insert(0, _number(parts[-1]))
+        except ValueError:
+            break
+        parts.pop()
+    family = '_'.join(parts)
+    if family in INPUT_SERIES and not args:
+        return family, ()
+    spec = INDICATORS.get(family)
+    if spec is None:
+        raise ValueError(f"Unknown indicator: {name}")
+    if len(args) > len(spec.params):
+        raise ValueError(f"Too many parameters for {family}: {name}")
+    values = []
+    for i, (param, default) in enumerate(spec.params):
+        value = args[i] if i < len(args) else default
+        if value is None:
+            raise ValueError(f"{family} needs a {param}, e.g. {family}_20")
+        if param in FRACTIONAL_PARAMS:
+            if not 0 < value < math.inf:
+                raise ValueError(f"{name}: {param} must be a positive number, got {value}")
+        elif not isinstance(value, int) or value < spec.minimum:
+            raise ValueError(f"{name}: {param} must be a whole number of at least {spec.minimum}, got {value}")
+        values.append(value)
+    return family, tuple(values)
+
+def _node_name(family, *params):
+    return '_'.join([family] + [str(p) for p in params])
+
+class _Evaluation:
+    """Computes requested indicators, evaluating each dependency exactly once."""
+
+    def __init__(self, inputs):
+        self.shape = inputs['Close'].shape
+        self.values = {(name, ()): series for name, series in inputs.items()}
+
+    def get(self, name, out=None):
+        key = _parse_indicator(name)
+        value = self.values.get(key)
+        if value is None:
+            family, values = key
+            spec = INDICATORS[family]
+            params = dict(zip((param for param, _ in spec.params), values))
+            deps = [self.get(dep) for dep in spec.depends(**params)]
+            if spec.array:
+                target = out if out is not None else np.empty(self.shape)
+                value = spec.compute(target, *deps, **params)
+            else:
+                value = spec.compute(None, *deps, **params)
+            self.values[key] = value
+        elif out is not None and value is not out:
+            out[...] = value
+        return value
+
+def _prefix_sums(out, x):
+    return _WindowSums(x)
+
+def _delta(out, close):
+    # A bar without a previous close counts as no change
+    out[:1] = 0.0
+    np.subtract(close[1:], close[:-1], out=out[1:])
+    return out
+
+def _move_sums(sign):
+    def compute(out, delta, close):
+        # Bars that are missing altogether (e.g. before a listing) stay missing
+        moves = np.fmax(delta if sign > 0 else -delta, 0.0)
+        moves[np.isnan(close)] = np.nan
+        return _WindowSums(moves)
+    return compute
+
+def _true_range_sums(out, high, low, close):
+    # fmax skips the missing previous close on the first bar like a row max does
+    true_range = np.subtract(high, low)
+    previous = np.abs(high[1:] - close[:-1])
+    np.fmax(true_range[1:], previous, out=true_range[1:])
+    np.subtract(low[1:], close[:-1], out=previous)
+    np.abs(previous, out=previous)
+    np.fmax(true_range[1:], previous, out=true_range[1:])
+    return _WindowSums(true_range)
+
+def _window_mean(out, sums, window):
+    return sums.mean(window, out=out)
+
+def _ema_of(out, x, span):
+    return _ema(x, span, out=out)
+
+def _signal(out, macd, fast, slow, span):
+    return _ema(macd, span, out=out)
+
+def _difference(out, a, b, **params):
+    return np.subtract(a, b, out=out)
+
+def _copy(out, x, **params):
+    out[...] = x
+    return out
+
+def _rsi(out, gain_sums, loss_sums, window):
+    gain_sums.mean(window, out=out)
+    loss = loss_sums.mean(window, out=np.empty_like(out))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(out, loss, out=out)
+        out += 1
+        np.divide(100, out, out=out)
+        np.subtract(100, out, out=out)
+    return out
+
+def _band_std(out, close, middle, window):
+    return _rolling_std(close, window, middle, out=out)
+
+def _band(sign):
+    def compute(out, middle, std, window, width):
+        np.multiply(std, sign * width, out=out)
+        out += middle
+        return out
+    return compute
+
+def _ratio(out, a, b, **params):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.divide(a, b, out=out)
+
+# Shared intermediates
+register_indicator('_CloseSums', _prefix_sums, depends=lambda: ['Close'], array=False)
+register_indicator('_VolumeSums', _prefix_sums, depends=lambda: ['Volume'], array=False)
+register_indicator('_Delta', _delta, depends=lambda: ['Close'])
+register_indicator('_GainSums', _move_sums(1), depends=lambda: ['_Delta', 'Close'], array=False)
+register_indicator('_LossSums', _move_sums(-1), depends=lambda: ['_Delta', 'Close'], array=False)
+register_indicator('_TrueRangeSums', _true_range_sums, depends=lambda: ['High', 'Low', 'Close'], array=False)
+register_indicator('_BB_Std', _band_std, [('window', 20)],
+                   lambda window: ['Close', _node_name('SMA', window)], minimum=2)
+
+# Moving averages
+register_indicator('SMA', _window_mean, [('window', None)], lambda window: ['_CloseSums'])
+register_indicator('EMA', _ema_of, [('span', None)], lambda span: ['Close'])
+
+# MACD
+register_indicator('MACD', _difference, [('fast', 12), ('slow', 26)],
+                   lambda fast, slow: [_node_name('EMA', fast), _node_name('EMA', slow)])
+register_indicator('MACD_Signal', _signal, [('fast', 12), ('slow', 26), ('span', 9)],
+                   lambda fast, slow, span: [_node_name('MACD', fast, slow)])
+register_indicator('MACD_Hist', _difference, [('fast', 12), ('slow', 26), ('signal', 9)],
+                   lambda fast, slow, signal: [_node_name('MACD', fast, slow),
+                                               _node_name('MACD_Signal', fast, slow, signal)])
+
+# RSI
+register_indicator('RSI', _rsi, [('window', 14)], lambda window: ['_GainSums', '_LossSums'])
+
+# Bollinger Bands (the middle band is the SMA over the same window)
+register_indicator('BB_Middle', _copy, [('window', 20)], lambda window: [_node_name('SMA', window)],
+                   minimum=2)
+register_indicator('BB_Upper', _band(1), [('window', 20), ('width', 2)],
+                   lambda window, width: [_node_name('SMA', window), _node_name('_BB_Std', window)], minimum=2)
+register_indicator('BB_Lower', _band(-1), [('window', 20), ('width', 2)],
+                   lambda window, width: [_node_name('SMA', window), _node_name('_BB_Std', window)], minimum=2)
+
+# Volume indicators
+register_indicator('Volume_SMA', _window_mean, [('window', 20)], lambda window: ['_VolumeSums'])
+register_indicator('Volume_Ratio', _ratio, [('window', 20)],
+                   lambda window: ['Volume', _node_name('Volume_SMA', window)])
+
+# ATR (Average True Range)
+register_indicator('ATR', _window_mean, [('window', 14)], lambda window: ['_TrueRangeSums'])
+
+def calculate_indicator_block(close, high, low, volume, names=None):
+    """Compute the requested indicators into one preallocated float64 block.
+
+    Inputs are float64 arrays of shape (bars,) or (bars, tickers). The
+    result has shape (len(names), bars) or (len(names), bars, tickers), so
+    each indicator is one contiguous slab, in the order of ``names``
+    (INDICATOR_NAMES by default). Only the dependency subgraph of the
+    requested names is evaluated, and shared intermediates such as prefix
+    sums or the EMAs behind MACD are computed once.
+    """
+    names = list(INDICATOR_NAMES if names is None else names)
+    with span('indicators.calculate', bars=close.shape[0], tickers=close.size // max(close.shape[0], 1),
+              indicators=len(names)):
+        block = np.empty((len(names),) + close.shape)
+        evaluation = _Evaluation({'Close': close, 'High': high, 'Low': low, 'Volume': volume})
+        for name, out in zip(names, block):
+            evaluation.get(name, out=out)
+    return block
+
+def calculate_technical_indicators(df, names=None):
+    """Calculate various technical indicators for the given price data.
+
+    ``names`` selects which indicators to compute, e.g. ['SMA_20', 'RSI',
+    'MACD'] or custom windows such as 'SMA_100' and 'RSI_21'; by default
+    every name in INDICATOR_NAMES is returned.
+    """
+    names = list(INDICATOR_NAMES if names is None else names)
+    block = calculate_indicator_block(
+        df['Close'].to_numpy(dtype=np.float64),
+        df['High'].to_numpy(dtype=np.float64),
+        df['Low'].to_numpy(dtype=np.float64),
+        df['Volume'].to_numpy(dtype=np.float64),
+        names
+    )
+    # Each Series is a view onto one slab of the block
+    return {name: pd.Series(values, index=df.index, name=name, copy=False)
+            for name, values in zip(names, block)}
+
+OHLCV_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def _panel_fields(panel):
+    """Split a multi-ticker OHLCV frame into one dates x tickers frame per field.
+
+    Accepts wide frames with (field, ticker) or (ticker, field) column
+    levels, as returned by yf.download, and long frames indexed by
+    (date, ticker) or (ticker, date) with one column per field.
+    """
+    if isinstance(panel.columns, pd.MultiIndex):
+        for level in range(panel.columns.nlevels):
+            if 'Close' in panel.columns.get_level_values(level):
+                return {field: panel.xs(field, axis=1, level=level) for field in OHLCV_FIELDS}
+        raise ValueError("Panel columns have no 'Close' level.")
+
+    if isinstance(panel.index, pd.MultiIndex):
+        # Put the ticker level in the columns, keeping dates as rows
+        ticker_level = 1 if isinstance(panel.index.levels[0], pd.DatetimeIndex) else 0
+        return {field: panel[field].unstack(ticker_level).sort_index() for field in OHLCV_FIELDS}
+
+    raise ValueError("Panel must have MultiIndex columns or a (date, ticker) MultiIndex.")
+
+def calculate_panel_indicators(panel, names=None):
+    """Calculate technical indicators for many tickers at once.
+
+    Every indicator is computed with 2-D NumPy operations over a dates x
+    tickers array instead of looping over tickers. Returns one float64
+    DataFrame with (indicator, ticker) columns; for screening on the newest
+    bar use ``result.iloc[-1].unstack(0)`` to get a tickers x indicators table.
+    ``names`` selects indicators as in calculate_technical_indicators.
+    """
+    names = list(INDICATOR_NAMES if names is None else names)
+    fields = _panel_fields(panel)
+    close = fields['Close']
+    block = calculate_indicator_block(
+        close.to_numpy(dtype=np.float64),
+        fields['High'].to_numpy(dtype=np.float64),
+        fields['Low'].to_numpy(dtype=np.float64),
+        fields['Volume'].to_numpy(dtype=np.float64),
+        names
+    )
+    columns = pd.MultiIndex.from_product([names, close.columns], names=['indicator', 'ticker'])
+    return pd.DataFrame(block.transpose(1, 0, 2).reshape(len(close), -1), index=close.index, columns=columns)
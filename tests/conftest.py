@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# database and async_database bind their engines at import, so point them at
+# a throwaway SQLite file before any test imports them; keep the sentiment
+# score cache in memory
+_scratch = tempfile.mkdtemp(prefix='stock-sentiment-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ.pop('ASYNC_DATABASE_URL', None)
+os.environ['SENTIMENT_CACHE_PATH'] = ''
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+from analytics import TRADING_DAYS, rolling_volatility
+
+def test_rolling_volatility_matches_pandas():
+    rng = np.random.default_rng(0)
+    # A large common offset would cost an uncentred sum-of-squares its precision
+    returns = 1000.0 + rng.normal(scale=0.02, size=(600, 4))
+    returns[50:53, 1] = np.nan
+    returns[:100, 2] = np.nan
+    expected = pd.DataFrame(returns).rolling(20).std().to_numpy() * np.sqrt(TRADING_DAYS)
+    np.testing.assert_allclose(rolling_volatility(returns, 20), expected, rtol=1e-8, atol=1e-12, equal_nan=True)
+
+def test_rolling_volatility_of_a_series():
+    returns = np.random.default_rng(1).normal(scale=0.01, size=300)
+    expected = pd.Series(returns).rolling(30).std().to_numpy() * np.sqrt(52)
+    np.testing.assert_allclose(rolling_volatility(returns, 30, periods_per_year=52), expected,
+                               rtol=1e-10, equal_nan=True)
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+import async_database
+import database
+
+def analysis(price, minutes_ago=0, items=()):
+    return {
+        'price': price,
+        'sentiment': 0.25,
+        'volume': 1000,
+        'timestamp': datetime.now() - timedelta(minutes=minutes_ago),
+        'sentiment_items': list(items)
+    }
+
+@pytest.fixture(scope='module', autouse=True)
+def schema():
+    database.init_db()
+    asyncio.run(async_database.init_db())
+    yield
+    asyncio.run(async_database.dispose())
+
+def test_async_url_swaps_driver():
+    assert async_database._async_url('sqlite:///./x.db') == 'sqlite+aiosqlite:///./x.db'
+    assert async_database._async_url('postgresql+psycopg2://u@h/db') == 'postgresql+asyncpg://u@h/db'
+    with pytest.raises(ValueError):
+        async_database._async_url('oracle://u@h/db')
+
+def test_save_and_read_analyses():
+    async def run():
+        await async_database.save_analyses([
+            ('ASYNC', analysis(101.0, minutes_ago=2)),
+            ('ASYNC', analysis(102.0, minutes_ago=1))
+        ])
+        return await async_database.get_recent_analysis('ASYNC', limit=10)
+
+    rows = asyncio.run(run())
+    assert [row.price for row in rows] == [102.0, 101.0]
+
+def test_lower_case_ticker_round_trip():
+    asyncio.run(async_database.save_analysis('asynclow', analysis(3.0)))
+    rows = asyncio.run(async_database.get_recent_analysis('asynclow'))
+    assert [(row.ticker, row.price) for row in rows] == [('ASYNCLOW', 3.0)]
+
+def test_reads_include_rows_queued_by_sync_writer():
+    database.save_analysis('QUEUED', analysis(50.0))
+    rows = asyncio.run(async_database.get_recent_analysis('QUEUED'))
+    assert [row.price for row in rows] == [50.0]
+
+def test_sentiment_items_are_stored_upper_case():
+    item = {'source': 'news', 'text': 'Shares rally', 'vader': 0.4, 'textblob': 0.2, 'score': 0.34}
+    asyncio.run(async_database.save_analysis('lower', analysis(10.0, items=[item])))
+    trend = database.get_source_sentiment_trend('LOWER')
+    assert [(row['source'], row['items']) for row in trend] == [('news', 1)]
+
+def test_watchlist_round_trip():
+    async def run():
+        await async_database.add_to_watchlist(7, 'AAPL')
+        return await async_database.get_watchlist(7)
+
+    assert [entry.ticker for entry in asyncio.run(run())] == ['AAPL']
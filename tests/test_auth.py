@@ -0,0 +1,11 @@
+import pytest
+import auth
+
+def test_pwd_context_is_still_exported_lazily(monkeypatch):
+    context = object()
+    monkeypatch.setattr(auth, '_pwd_context', context)
+    assert auth.pwd_context is context
+    from auth import pwd_context
+    assert pwd_context is context
+    with pytest.raises(AttributeError):
+        auth.missing
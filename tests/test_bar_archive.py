@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from bar_archive import BarArchive, BarArchiveWriter, required_warmup, write_archive
+from benchmarks.fixtures import synthetic_ohlcv
+
+def test_writer_drops_bytes_past_the_committed_index(tmp_path):
+    path = str(tmp_path / 'archive')
+    first = synthetic_ohlcv(100, seed=1, freq='B')
+    write_archive(path, {'AAA': first})
+
+    # A writer that dies before close() leaves bars in the field files but not in the index
+    crashed = BarArchiveWriter(path)
+    crashed.append('BBB', synthetic_ohlcv(50, seed=2, freq='B'))
+    crashed._close_files()
+
+    second = synthetic_ohlcv(80, seed=3, freq='B')
+    with BarArchiveWriter(path) as writer:
+        writer.append('CCC', second)
+
+    archive = BarArchive(path)
+    assert archive.tickers() == ['AAA', 'CCC']
+    assert (tmp_path / 'archive' / 'Close.bin').stat().st_size == 180 * 8
+    np.testing.assert_array_equal(archive.frame('CCC')['Close'].to_numpy(), second['Close'].to_numpy())
+    np.testing.assert_array_equal(archive.frame('AAA')['Close'].to_numpy(), first['Close'].to_numpy())
+
+def test_chunked_scan_matches_single_pass(tmp_path):
+    path = str(tmp_path / 'archive')
+    write_archive(path, {'AAA': synthetic_ohlcv(50, seed=4, freq='B'),
+                         'BBB': synthetic_ohlcv(3000, seed=5, freq='B')})
+    archive = BarArchive(path)
+    full = archive.indicators('BBB')
+    chunks = list(archive.scan_indicators('BBB', chunk_bars=700))
+    assert len(chunks) == 5
+    np.testing.assert_array_equal(np.concatenate([ts for ts, _ in chunks]), archive.bars('BBB')['ts'])
+    np.testing.assert_allclose(np.concatenate([block for _, block in chunks], axis=1), full,
+                               rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_scan_rejects_short_warmup(tmp_path):
+    path = str(tmp_path / 'archive')
+    write_archive(path, {'AAA': synthetic_ohlcv(500, seed=6, freq='B')})
+    assert required_warmup(['SMA_20']) == 21
+    with pytest.raises(ValueError):
+        next(BarArchive(path).scan_indicators('AAA', ['SMA_20'], chunk_bars=100, warmup=5))
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from benchmarks.fixtures import synthetic_ohlcv
+from chart_data import downsample_ohlcv, downsample_series, lttb_indices
+
+def reference_lttb(x, y, max_points):
+    # Textbook LTTB, one point and one triangle at a time
+    n = len(x)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep, previous = [0], 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_x, next_y = np.mean(x[hi:edges[b + 2]]), np.mean(y[hi:edges[b + 2]])
+        else:
+            next_x, next_y = x[-1], y[-1]
+        best, best_area = lo, -1.0
+        for i in range(lo, hi):
+            area = abs((x[previous] - next_x) * (y[i] - y[previous]) - (x[previous] - x[i]) * (next_y - y[previous]))
+            if area > best_area:
+                best, best_area = i, area
+        keep.append(best)
+        previous = best
+    return keep + [n - 1]
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.5, 1.5, 2000))
+    y = np.cumsum(rng.normal(size=2000))
+    keep = lttb_indices(x, y, 150)
+    assert len(keep) == 150 and keep[0] == 0 and keep[-1] == 1999
+    assert np.all(np.diff(keep) > 0)
+    assert keep.tolist() == reference_lttb(x, y, 150)
+
+def test_lttb_keeps_spikes_and_short_series():
+    y = np.zeros(1000)
+    y[537] = 50.0
+    assert 537 in lttb_indices(np.arange(1000), y, 20)
+    assert lttb_indices(np.arange(10), np.arange(10), 20).tolist() == list(range(10))
+
+def test_downsample_series_drops_missing_values():
+    series = pd.Series(np.arange(5000, dtype=float), index=pd.date_range('2024-01-01', periods=5000, freq='min'))
+    series.iloc[::7] = np.nan
+    points = downsample_series(series, 100)
+    assert len(points) == 100 and not points.isna().any()
+
+def test_downsample_ohlcv_aggregates_buckets():
+    df = synthetic_ohlcv(1000, seed=1)
+    candles = downsample_ohlcv(df, 300)
+    assert len(candles) == 300
+    groups = np.searchsorted(df.index.get_indexer(candles.index), np.arange(len(df)), side='right') - 1
+    expected = df.groupby(groups).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                       'Volume': 'sum'})
+    np.testing.assert_allclose(candles.to_numpy(), expected[candles.columns].to_numpy())
+    assert downsample_ohlcv(df, 2000) is df
@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import data_fetcher
+from benchmarks.fixtures import stub_clients, synthetic_corpus
+from data_fetcher import (ERROR_MESSAGES, RATE_LIMITED_MESSAGES, SUBREDDITS, fetch_all,
+                          invalidate_fetch_cache, iter_fetch)
+from fetch_cache import TokenBucket
+
+class SlowNews:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.calls = 0
+
+    def get_everything(self, q, from_param=None, language=None, sort_by=None):
+        self.calls += 1
+        time.sleep(self.seconds)
+        return {'articles': [{'title': 'late', 'source': {'name': 'Newswire'}}]}
+
+class BrokenTwitter:
+    def search_tweets(self, q, lang=None, count=100):
+        raise RuntimeError("401 Unauthorized")
+
+@pytest.fixture(autouse=True)
+def empty_fetch_cache():
+    invalidate_fetch_cache()
+    yield
+    invalidate_fetch_cache()
+
+def test_fetch_all_with_stub_clients():
+    corpus = synthetic_corpus(50)
+    results, timed_out = fetch_all('AAPL', clients=stub_clients(corpus))
+    assert timed_out == []
+    assert results['twitter'] == corpus
+    assert len(results['reddit']) == 10 * len(SUBREDDITS)
+    assert all(post.endswith(tuple(f" - r/{name}" for name in SUBREDDITS)) for post in results['reddit'])
+    assert results['news'] == [f"{text} - Newswire" for text in reversed(corpus)]
+
+def test_sources_run_concurrently():
+    clients = stub_clients(synthetic_corpus(20), latency=0.2)
+    start = time.monotonic()
+    fetch_all('MSFT', clients=clients)
+    # The sources overlap; an injected Reddit client's three searches take turns
+    assert time.monotonic() - start < 0.9
+
+def test_timed_out_source_is_cut_short():
+    clients = stub_clients(synthetic_corpus(20))
+    clients['news'] = SlowNews(1.0)
+    start = time.monotonic()
+    results, timed_out = fetch_all('TSLA', clients=clients, timeouts={'news': 0.2})
+    assert time.monotonic() - start < 0.8
+    assert timed_out == ['news']
+    assert results['news'] == []
+    assert len(results['twitter']) == 20
+
+def test_repeat_request_joins_call_in_flight():
+    clients = stub_clients(synthetic_corpus(20))
+    clients['news'] = SlowNews(0.6)
+    fetch_all('NVDA', clients=clients, timeouts={'news': 0.1})
+    _, timed_out = fetch_all('NVDA', clients=clients, timeouts={'news': 0.1})
+    assert timed_out == ['news']
+    assert clients['news'].calls == 1
+
+def test_failing_source_reports_error():
+    clients = stub_clients(synthetic_corpus(20))
+    clients['twitter'] = BrokenTwitter()
+    results, timed_out = fetch_all('AMD', clients=clients)
+    assert results['twitter'] == [ERROR_MESSAGES['twitter']]
+    assert timed_out == []
+    assert len(results['news']) == 20
+
+def test_responses_are_cached_per_client():
+    first = stub_clients(['first post'])
+    second = stub_clients(['second post'])
+    assert fetch_all('GME', sources=['twitter'], clients=first)[0]['twitter'] == ['first post']
+    first['twitter'].corpus = ['changed']
+    assert fetch_all('GME', sources=['twitter'], clients=first)[0]['twitter'] == ['first post']
+    assert fetch_all('GME', sources=['twitter'], clients=second)[0]['twitter'] == ['second post']
+
+def test_iter_fetch_yields_in_completion_order():
+    clients = stub_clients(synthetic_corpus(20))
+    clients['news'] = SlowNews(0.2)
+    order = [source for source, _, _, _ in iter_fetch('META', clients=clients)]
+    assert order[-1] == 'news'
+    assert sorted(order) == ['news', 'reddit', 'twitter']
+
+def test_registry_builds_reddit_client_per_thread():
+    registry = data_fetcher.ClientRegistry({'reddit': lambda session=None: object()})
+    first = registry.get('reddit')
+    assert registry.get('reddit') is first
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other = executor.submit(registry.get, 'reddit').result()
+    assert other is not first
+    registry.invalidate('reddit')
+    assert registry.get('reddit') is not first
+
+def test_calls_over_quota_wait_for_a_token(monkeypatch):
+    # Two tokens, then one every 0.1s
+    monkeypatch.setitem(data_fetcher.rate_limiters, 'news', TokenBucket(10.0, capacity=2))
+    clients = stub_clients(synthetic_corpus(5))
+    start = time.monotonic()
+    for ticker in ('AAA', 'BBB', 'CCC', 'DDD'):
+        results, _ = fetch_all(ticker, sources=['news'], clients=clients)
+        assert len(results['news']) == 5
+    assert time.monotonic() - start >= 0.15
+
+def test_quota_beyond_deadline_is_rate_limited(monkeypatch):
+    monkeypatch.setitem(data_fetcher.rate_limiters, 'news', TokenBucket(100 / 86400, capacity=2))
+    clients = stub_clients(synthetic_corpus(5))
+    for ticker in ('AAA', 'BBB'):
+        fetch_all(ticker, sources=['news'], clients=clients)
+    start = time.monotonic()
+    (source, posts, timed_out, failure), = iter_fetch('CCC', ['news'], clients=clients)
+    assert time.monotonic() - start < 0.5
+    assert (posts, timed_out, failure) == ([], False, 'rate_limited')
+    results, _ = fetch_all('CCC', sources=['news'], clients=clients)
+    assert results['news'] == [RATE_LIMITED_MESSAGES['news']]
+    # Responses already cached are still served
+    assert len(fetch_all('AAA', sources=['news'], clients=clients)[0]['news']) == 5
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+import pytest
+import database
+from database import AnalysisWriter, ROLLUP_BUCKETS, get_analysis_history, get_recent_analysis, get_rollups
+
+@pytest.fixture(scope='module', autouse=True)
+def schema():
+    database.init_db()
+
+def analysis(price):
+    return {'price': price, 'sentiment': 0.1, 'volume': 10, 'timestamp': datetime.now()}
+
+def test_writer_batches_rows():
+    writer = AnalysisWriter(batch_size=100, flush_interval=0.05)
+    writer.submit_many([('BATCH', analysis(float(i))) for i in range(250)])
+    assert writer.flush(timeout=10)
+    writer.close()
+    assert writer.stats() == {'written': 250, 'dropped': 0, 'retried': 0, 'batches': 3, 'pending': 0}
+    assert len(get_recent_analysis('BATCH', limit=500)) == 250
+
+def test_writer_drops_only_rows_that_keep_failing():
+    writer = AnalysisWriter(batch_size=10, flush_interval=0.05, retries=2, retry_delay=0.001)
+    write = writer._write
+
+    def reject_bad_rows(rows, items):
+        if any(row['ticker'] == 'BAD' for row in rows):
+            raise RuntimeError("constraint violated")
+        write(rows, items)
+
+    writer._write = reject_bad_rows
+    writer.submit_many([('GOOD1', analysis(1.0)), ('BAD', analysis(2.0)), ('GOOD2', analysis(3.0))])
+    assert writer.flush(timeout=10)
+    writer.close()
+    stats = writer.stats()
+    assert (stats['written'], stats['dropped'], stats['retried']) == (2, 1, 2)
+    assert len(get_recent_analysis('GOOD1')) == 1 and len(get_recent_analysis('GOOD2')) == 1
+    assert get_recent_analysis('BAD') == []
+
+def test_lower_case_ticker_round_trip():
+    now = datetime.now()
+    database.save_analysis('lowcase', {**analysis(5.0), 'timestamp': now - timedelta(minutes=1)})
+    assert [row.price for row in get_recent_analysis('lowcase')] == [5.0]
+    assert [rollup.last_price for rollup in database.get_rollups('lowcase', 'day')] == [5.0]
+    assert [point['price'] for point in database.get_analysis_history('lowcase', now - timedelta(hours=1))] == [5.0]
+    assert list(database.get_latest_analysis_times(['lowcase'])) == ['lowcase']
+
+def rollup_row(ticker, timestamp, sentiment, price):
+    return {'ticker': ticker, 'timestamp': timestamp, 'sentiment': sentiment, 'price': price, 'volume': 10}
+
+def test_merge_rollups_upserts_min_max_and_last_price():
+    hour = ROLLUP_BUCKETS['hour'](datetime.now() - timedelta(hours=3))
+    batches = [
+        [rollup_row('MERGE', hour + timedelta(minutes=30), 0.2, 20.0)],
+        # An older row arriving later must not replace the last price
+        [rollup_row('MERGE', hour + timedelta(minutes=10), -0.4, 10.0),
+         rollup_row('MERGE', hour + timedelta(minutes=20), 0.1, 15.0)],
+        [rollup_row('MERGE', hour + timedelta(minutes=40), 0.6, 40.0)]
+    ]
+    for rows in batches:
+        with database.engine.begin() as connection:
+            database._merge_rollups(connection, database._rollup_rows(rows))
+    for bucket in ('hour', 'day'):
+        rollup, = get_rollups('MERGE', bucket)
+        assert (rollup.count, rollup.volume_sum) == (4, 40)
+        assert (rollup.sentiment_min, rollup.sentiment_max) == (-0.4, 0.6)
+        assert rollup.sentiment_sum == pytest.approx(0.5)
+        assert (rollup.last_price, rollup.last_timestamp) == (40.0, hour + timedelta(minutes=40))
+
+def test_history_resolution_follows_range_length():
+    now = datetime.now()
+    times = [now - timedelta(days=200), now - timedelta(days=10), now - timedelta(hours=1)]
+    database.save_analyses([('HIST', {**analysis(float(i)), 'timestamp': ts}) for i, ts in enumerate(times)])
+    # Up to two days: raw rows
+    assert [p['timestamp'] for p in get_analysis_history('HIST', now - timedelta(days=1))] == times[2:]
+    # Up to 90 days: hourly rollups
+    hourly = get_analysis_history('HIST', now - timedelta(days=30))
+    assert [p['timestamp'] for p in hourly] == [ROLLUP_BUCKETS['hour'](ts) for ts in times[1:]]
+    # Longer: daily rollups
+    daily = get_analysis_history('HIST', now - timedelta(days=365))
+    assert [p['timestamp'] for p in daily] == [ROLLUP_BUCKETS['day'](ts) for ts in times]
+    assert [p['price'] for p in daily] == [0.0, 1.0, 2.0]
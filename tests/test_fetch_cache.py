@@ -0,0 +1,77 @@
+import threading
+import time
+import pytest
+from fetch_cache import RateLimited, TokenBucket, TTLCache
+
+def test_concurrent_callers_share_one_computation():
+    cache = TTLCache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', 60, compute)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 5
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['misses'], stats['shared']) == (1, 4)
+
+def test_errors_reach_waiters_but_are_not_cached():
+    cache = TTLCache()
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('k', 60, lambda: (_ for _ in ()).throw(RuntimeError("down")))
+    assert cache.get_or_compute('k', 60, lambda: 'ok') == 'ok'
+
+def test_follower_gives_up_after_timeout():
+    cache = TTLCache()
+    release = threading.Event()
+    leader = threading.Thread(target=cache.get_or_compute, args=('k', 60, lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.05)
+    with pytest.raises(TimeoutError):
+        cache.get_or_compute('k', 60, lambda: None, timeout=0.05)
+    release.set()
+    leader.join()
+    assert cache.get('k') is True
+
+def test_get_stale_returns_expired_entries():
+    cache = TTLCache(max_entries=1)
+    cache.set('k', 'old', ttl=0)
+    assert cache.get('k') is None
+    assert cache.get_stale('k') == 'old'
+    cache.set('other', 'new', ttl=60)
+    assert cache.get_stale('k') is None
+
+def test_token_bucket_reserves_only_what_it_can_wait_for():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire(max_wait=0.0) is None
+    wait = bucket.try_acquire(max_wait=1.0)
+    assert 0.05 < wait <= 0.1
+    # The refused call reserved nothing, so the next token is one interval further on
+    assert 0.15 < bucket.try_acquire(max_wait=1.0) <= 0.2
+
+def test_token_bucket_refund_and_acquire():
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    bucket.try_acquire()
+    bucket.refund()
+    assert bucket.try_acquire() == 0.0
+    with pytest.raises(RateLimited):
+        bucket.acquire(timeout=0.1)
+    fast = TokenBucket(rate=20.0, capacity=1)
+    fast.acquire()
+    start = time.monotonic()
+    fast.acquire(timeout=1.0)
+    assert time.monotonic() - start >= 0.03
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from benchmarks.fixtures import synthetic_ohlcv
+from indicator_state import IndicatorState
+from technical_analysis import INDICATOR_NAMES, calculate_technical_indicators
+
+def batch_indicators(df):
+    return pd.DataFrame(calculate_technical_indicators(df), index=df.index)[INDICATOR_NAMES]
+
+def test_update_frame_matches_batch():
+    df = synthetic_ohlcv(3000, seed=3, freq='B')
+    np.testing.assert_allclose(
+        IndicatorState().update_frame(df).to_numpy(),
+        batch_indicators(df).to_numpy(),
+        rtol=1e-12, atol=1e-12
+    )
+
+def test_appended_bars_match_batch():
+    df = synthetic_ohlcv(1500, seed=4, freq='B')
+    state = IndicatorState.from_frame(df.iloc[:1000])
+    rows = state.update_frame(df.iloc[1000:])
+    np.testing.assert_allclose(
+        rows.to_numpy(), batch_indicators(df).iloc[1000:].to_numpy(), rtol=1e-12, atol=1e-12
+    )
+
+def test_update_returns_latest_row():
+    df = synthetic_ohlcv(300, seed=5, freq='B')
+    state = IndicatorState.from_frame(df.iloc[:-1])
+    last = df.iloc[-1]
+    latest = state.update(last['Open'], last['High'], last['Low'], last['Close'], last['Volume'])
+    expected = batch_indicators(df).iloc[-1]
+    np.testing.assert_allclose([latest[name] for name in INDICATOR_NAMES], expected.to_numpy(),
+                               rtol=1e-12, atol=1e-12)
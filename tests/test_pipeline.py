@@ -0,0 +1,38 @@
+import pytest
+from benchmarks.fixtures import StubPriceProvider, stub_clients, synthetic_corpus
+from data_fetcher import ERROR_MESSAGES, invalidate_fetch_cache
+from pipeline import SENTIMENT_SOURCES, build_snapshot, iter_analysis
+from price_store import PriceStore
+
+class BrokenTwitter:
+    def search_tweets(self, q, lang=None, count=100):
+        raise RuntimeError("401 Unauthorized")
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / 'prices.db'), StubPriceProvider(history_bars=300))
+
+@pytest.fixture(autouse=True)
+def empty_fetch_cache():
+    invalidate_fetch_cache()
+    yield
+    invalidate_fetch_cache()
+
+def test_events_arrive_in_stage_order(store):
+    stages = [stage for stage, _ in iter_analysis('AAPL', '1M', include_info=False,
+                                                  clients=stub_clients(synthetic_corpus(30)), store=store)]
+    assert stages[:2] == ['history', 'indicators']
+    assert stages.count('sentiment') == len(SENTIMENT_SOURCES)
+    assert stages[-2:] == ['info', 'snapshot']
+
+def test_failed_source_is_left_out_of_sentiment(store):
+    clients = stub_clients(synthetic_corpus(30))
+    clients['twitter'] = BrokenTwitter()
+    snapshot = build_snapshot('MSFT', '1M', include_info=False, clients=clients, store=store)
+    assert snapshot.failures == {'twitter': 'error'}
+    assert snapshot.posts['twitter'] == []
+    expected = (snapshot.source_sentiment['reddit'] + snapshot.source_sentiment['news']) / 2
+    assert snapshot.sentiment == pytest.approx(expected)
+    items = snapshot.analysis()['sentiment_items']
+    assert items and all(item['source'] != 'twitter' for item in items)
+    assert ERROR_MESSAGES['twitter'] not in [item['text'] for item in items]
@@ -0,0 +1,95 @@
+import threading
+import time
+import pandas as pd
+import pytest
+import price_store
+from benchmarks.fixtures import StubPriceProvider
+from price_store import PriceStore
+
+class RecordingProvider(StubPriceProvider):
+    """StubPriceProvider that records its calls and can report a split."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+        self.scale = 1.0
+        self.split_on_last_bar = False
+        self.fail = False
+
+    def __call__(self, ticker, start=None, period=None):
+        self.requests.append({'start': start, 'period': period})
+        if self.fail:
+            raise ConnectionError("offline")
+        bars = super().__call__(ticker, start, period).copy()
+        bars[['Open', 'High', 'Low', 'Close']] *= self.scale
+        bars['Dividends'] = 0.0
+        bars['Stock Splits'] = 0.0
+        if self.split_on_last_bar:
+            bars.iloc[-1, bars.columns.get_loc('Stock Splits')] = 2.0
+        return bars
+
+@pytest.fixture
+def provider():
+    return RecordingProvider(history_bars=400)
+
+@pytest.fixture
+def store(tmp_path, provider):
+    return PriceStore(str(tmp_path / 'prices.db'), provider, refresh_seconds=0)
+
+def test_first_request_backfills_period(store, provider):
+    hist = store.get_history('aapl', '1mo')
+    assert provider.requests == [{'start': None, 'period': '1mo'}]
+    assert list(hist.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert str(hist.index.tz) == provider.tz
+    assert hist.index[0] >= pd.Timestamp.now(tz=provider.tz) - pd.DateOffset(months=1)
+    expected = provider._history('AAPL')['Close']
+    assert hist['Close'].tolist() == expected[expected.index >= hist.index[0]].tolist()
+
+def test_top_up_fetches_only_from_newest_bar(store, provider):
+    store.get_history('MSFT', '1y')
+    newest = store.read('MSFT').index[-1]
+    store.get_history('MSFT', '1y')
+    assert provider.requests[-1] == {'start': newest.strftime('%Y-%m-%d'), 'period': None}
+
+def test_fresh_store_is_served_without_provider(tmp_path, provider):
+    store = PriceStore(str(tmp_path / 'prices.db'), provider, refresh_seconds=3600)
+    first = store.get_history('TSLA', '3mo')
+    assert store.get_history('TSLA', '1mo').index[-1] == first.index[-1]
+    assert len(provider.requests) == 1
+
+def test_longer_period_backfills_again(store, provider):
+    store.get_history('NVDA', '1mo')
+    store.get_history('NVDA', '1y')
+    assert provider.requests[-1] == {'start': None, 'period': '1y'}
+
+def test_new_split_reloads_adjusted_history(store, provider):
+    before = store.get_history('AMD', '1y')
+    provider.scale = 0.5
+    provider.split_on_last_bar = True
+    after = store.get_history('AMD', '1y')
+    assert after['Close'].iloc[0] == pytest.approx(before['Close'].iloc[0] * 0.5)
+    calls = len(provider.requests)
+    # The same split is not reloaded twice
+    store.get_history('AMD', '1y')
+    assert len(provider.requests) == calls + 1
+
+def test_provider_failure_serves_stored_bars(store, provider):
+    stored = store.get_history('GME', '1mo')
+    provider.fail = True
+    pd.testing.assert_frame_equal(store.get_history('GME', '1mo'), stored)
+
+def test_get_price_store_builds_one_store_across_threads(monkeypatch, tmp_path):
+    class SlowStore(PriceStore):
+        def __init__(self):
+            time.sleep(0.05)
+            super().__init__(str(tmp_path / 'shared.db'), StubPriceProvider())
+
+    monkeypatch.setattr(price_store, '_store', None)
+    monkeypatch.setattr(price_store, 'PriceStore', SlowStore)
+    stores = []
+    threads = [threading.Thread(target=lambda: stores.append(price_store.get_price_store())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(store) for store in stores}) == 1
@@ -0,0 +1,49 @@
+import re
+import threading
+import numpy as np
+import sentiment_analysis
+from benchmarks.fixtures import synthetic_corpus
+from sentiment_analysis import SentimentEngine, clean_text, get_engine, get_sentiment_breakdown
+
+def test_get_engine_builds_one_engine_across_threads(monkeypatch):
+    monkeypatch.setattr(sentiment_analysis, '_engine', None)
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(get_engine())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(engine) for engine in engines}) == 1
+
+def test_score_vader_matches_score_batch():
+    texts = synthetic_corpus(300, seed=2)
+    engine = SentimentEngine()
+    np.testing.assert_array_equal(engine.score_vader(texts), engine.score_batch(texts).vader)
+
+def test_breakdown_reuses_batch():
+    texts = synthetic_corpus(300, seed=3)
+    batch = get_engine().score_batch(texts)
+    assert get_sentiment_breakdown(texts) == batch.breakdown()
+    assert get_sentiment_breakdown(texts, batch) == batch.breakdown()
+    assert get_sentiment_breakdown([]) == {'positive': 0, 'neutral': 0, 'negative': 0}
+
+def three_pass_clean(text):
+    # clean_text before it was folded into one precompiled pass
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\d+', '', text)
+    return text.lower()
+
+def test_clean_text_matches_three_pass_version():
+    texts = synthetic_corpus(2000, seed=4) + [
+        'Visit https://x.co/a?b=1 now!!', 'www.example.com/$TSLA', 'h1ttp://x', 'a1http://b.c',
+        'htt.p://x', 'Q3 2024: +12.5% \u00e9t\u00e9 \u0663\u0664', 'line\nhttp://x\nnext', '$AAPL :) \U0001f680', ''
+    ]
+    for text in texts:
+        assert clean_text(text) == three_pass_clean(text), text
+
+def test_clean_text_keeps_requested_tokens():
+    text = 'Buy $TSLA now :) \U0001f680 at http://x.co 100%'
+    assert clean_text(text) == three_pass_clean(text)
+    assert clean_text(text, keep_cashtags=True) == 'buy $tsla now   at  '
+    assert clean_text(text, keep_emoji=True) == 'buy tsla now :) \U0001f680 at  '
@@ -0,0 +1,34 @@
+from sentiment_cache import SentimentCache
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = SentimentCache('v1', max_entries=2)
+    cache.put_many({'a': (0.1, 0.1), 'b': (0.2, 0.2)})
+    assert cache.get_many(['a']) == {'a': (0.1, 0.1)}
+    cache.put_many({'c': (0.3, 0.3)})
+    assert cache.get_many(['a', 'b', 'c']) == {'a': (0.1, 0.1), 'c': (0.3, 0.3)}
+    stats = cache.stats()
+    assert (stats['memory_hits'], stats['misses'], stats['memory_entries']) == (3, 1, 2)
+
+def test_keys_depend_on_version():
+    assert SentimentCache('v1').key('text') == SentimentCache('v1').key('text')
+    assert SentimentCache('v1').key('text') != SentimentCache('v2').key('text')
+
+def test_disk_tier_is_shared_and_refills_memory(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    writer = SentimentCache('v1', max_entries=1, path=path)
+    writer.put_many({'a': (0.5, -0.5), 'b': (0.25, 0.0)})
+
+    reader = SentimentCache('v1', path=path)
+    assert reader.get_many(['a', 'b', 'missing']) == {'a': (0.5, -0.5), 'b': (0.25, 0.0)}
+    assert reader.get_many(['a']) == {'a': (0.5, -0.5)}
+    stats = reader.stats()
+    assert (stats['disk_hits'], stats['memory_hits'], stats['misses']) == (2, 1, 1)
+
+    reader.clear()
+    assert SentimentCache('v1', path=path).get_many(['a']) == {}
+
+def test_disk_lookups_are_chunked(tmp_path):
+    cache = SentimentCache('v1', max_entries=10, path=str(tmp_path / 'cache.db'))
+    items = {f"k{i}": (i / 2000, 0.0) for i in range(1200)}
+    cache.put_many(items)
+    assert SentimentCache('v1', path=cache.path).get_many(list(items)) == items
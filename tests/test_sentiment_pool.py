@@ -0,0 +1,17 @@
+import numpy as np
+from benchmarks.fixtures import synthetic_corpus
+from sentiment_analysis import SentimentEngine
+from sentiment_pool import SentimentPool, score_parallel
+
+def test_pool_matches_serial_engine():
+    texts = synthetic_corpus(500, seed=1)
+    serial = SentimentEngine().score_batch(texts)
+    with SentimentPool(workers=2, chunk_size=64) as pool:
+        parallel = pool.score_batch(texts)
+        assert pool.analyze_sentiment(texts) == serial.score()
+    np.testing.assert_array_equal(parallel.vader, serial.vader)
+    np.testing.assert_array_equal(parallel.textblob, serial.textblob)
+
+def test_empty_input():
+    batch = score_parallel([], workers=1)
+    assert len(batch.vader) == 0 and len(batch.textblob) == 0
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.fixtures import synthetic_panel
+from technical_analysis import (INDICATOR_NAMES, INDICATORS, _parse_indicator, calculate_panel_indicators,
+                                calculate_technical_indicators)
+
+TICKERS = ['AAA', 'BBB', 'CCC']
+
+def per_ticker(panel, ticker):
+    frame = panel.xs(ticker, axis=1, level=1)
+    return pd.DataFrame(calculate_technical_indicators(frame), index=frame.index)[INDICATOR_NAMES]
+
+def test_panel_matches_per_ticker_on_wide_input():
+    panel = synthetic_panel(400, TICKERS, seed=1)
+    result = calculate_panel_indicators(panel)
+    assert list(result.columns.get_level_values('indicator').unique()) == INDICATOR_NAMES
+    for ticker in TICKERS:
+        np.testing.assert_allclose(result.xs(ticker, axis=1, level='ticker')[INDICATOR_NAMES].to_numpy(),
+                                   per_ticker(panel, ticker).to_numpy(), rtol=1e-12, atol=1e-12)
+
+def test_panel_accepts_ticker_field_columns_and_long_frames():
+    panel = synthetic_panel(300, TICKERS, seed=2)
+    expected = calculate_panel_indicators(panel, ['SMA_20', 'RSI', 'ATR'])
+
+    swapped = panel.swaplevel(axis=1).sort_index(axis=1)
+    long_by_date = panel.stack(level=1, future_stack=True).rename_axis(['date', 'ticker'])
+    long_by_ticker = long_by_date.swaplevel().sort_index()
+    for variant in (swapped, long_by_date, long_by_ticker):
+        result = calculate_panel_indicators(variant, ['SMA_20', 'RSI', 'ATR'])
+        np.testing.assert_allclose(result[expected.columns].to_numpy(), expected.to_numpy(),
+                                   rtol=1e-12, atol=1e-12)
+
+def test_parse_indicator_fills_defaults():
+    assert _parse_indicator('RSI') == ('RSI', (14,))
+    assert _parse_indicator('RSI_21') == ('RSI', (21,))
+    assert _parse_indicator('MACD_Signal_5_35') == ('MACD_Signal', (5, 35, 9))
+    assert _parse_indicator('BB_Upper_20_2.5') == ('BB_Upper', (20, 2.5))
+    assert _parse_indicator('Close') == ('Close', ())
+    for name in ('Nope_5', 'SMA', 'RSI_14_3'):
+        with pytest.raises(ValueError):
+            _parse_indicator(name)
+
+def test_dependencies_are_evaluated_once(monkeypatch):
+    calls = []
+    spec = INDICATORS['EMA']
+    compute = spec.compute
+
+    def counting(out, *deps, **params):
+        calls.append(params['span'])
+        return compute(out, *deps, **params)
+
+    monkeypatch.setattr(spec, 'compute', counting)
+    frame = synthetic_panel(200, ['AAA'], seed=3).xs('AAA', axis=1, level=1)
+    result = calculate_technical_indicators(frame, ['MACD', 'MACD_Signal', 'MACD_Hist', 'EMA_12'])
+    assert sorted(calls) == [12, 26]
+    np.testing.assert_allclose(result['EMA_12'], frame['Close'].ewm(span=12, adjust=False).mean())
+
+def test_invalid_parameters_are_rejected():
+    for name in ('SMA_0', 'SMA_-3', 'SMA_2.5', 'EMA_nan', 'RSI_inf', 'BB_Upper_1', 'BB_Lower_20_0', 'BB_Upper_20_-1'):
+        with pytest.raises(ValueError, match=name):
+            _parse_indicator(name)
+    assert _parse_indicator('BB_Lower_2_0.5') == ('BB_Lower', (2, 0.5))
+    assert _parse_indicator('SMA_1') == ('SMA', (1,))
@@ -0,0 +1,179 @@
+import argparse
+import math
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import numpy as np
+from dotenv import load_dotenv
+from database import init_db, save_analysis, flush_analyses, get_watched_tickers, get_latest_analysis_times
+from fetch_cache import TTLCache
+from instrumentation import log_metrics, record
+from pipeline import analyze_ticker
+from price_store import get_price_store
+
+# Load environment variables
+load_dotenv()
+
+REFRESH_INTERVAL = int(os.getenv('WATCHLIST_REFRESH_SECONDS', '300'))
+WORKER_CONCURRENCY = int(os.getenv('WATCHLIST_CONCURRENCY', '4'))
+
+# Daily bars used to estimate how fast a ticker is moving
+VOLATILITY_PERIOD = '3mo'
+
+def realized_volatility(ticker):
+    """Annualized volatility of daily log returns from stored bars (0 if unknown)."""
+    close = get_price_store().read(ticker, VOLATILITY_PERIOD)['Close'].to_numpy(dtype=np.float64)
+    if len(close) < 3:
+        return 0.0
+    returns = np.diff(np.log(close))
+    volatility = float(np.std(returns, ddof=1) * math.sqrt(252))
+    return volatility if math.isfinite(volatility) else 0.0
+
+class RefreshScheduler:
+    """Orders watched tickers by how urgently they need a refresh.
+
+    A ticker's priority is its age in refresh intervals, scaled up by the
+    log of its watcher count and by its annualized volatility, so popular
+    and fast-moving names come due sooner. A ticker is due once its
+    priority reaches 1; one that has never been analyzed is always due
+    first. Failed refreshes are retried with exponential backoff.
+    """
+
+    def __init__(self, interval=REFRESH_INTERVAL, volatility=realized_volatility, max_backoff=3600):
+        self.interval = interval
+        self.volatility = volatility
+        self.max_backoff = max_backoff
+        self._volatility_cache = TTLCache(max_entries=4096)
+        self._failures = {}
+
+    def priority(self, age, watchers, volatility):
+        if age is None:
+            return math.inf
+        return (age / self.interval) * (1 + math.log(max(watchers, 1))) * (1 + volatility)
+
+    def _ticker_volatility(self, ticker):
+        # Volatility moves slowly; estimate it at most once per interval
+        try:
+            return self._volatility_cache.get_or_compute(
+                ticker, self.interval, lambda: self.volatility(ticker)
+            )
+        except Exception:
+            return 0.0
+
+    def plan(self, watched, last_times, now):
+        """Due (ticker, priority) pairs, most urgent first."""
+        due = []
+        for ticker, watchers in watched.items():
+            failures = self._failures.get(ticker)
+            if failures is not None and failures[1] > now:
+                continue
+            last = last_times.get(ticker)
+            age = None if last is None else max((now - last).total_seconds(), 0.0)
+            priority = self.priority(age, watchers, self._ticker_volatility(ticker))
+            if priority >= 1:
+                due.append((ticker, priority))
+        due.sort(key=lambda item: item[1], reverse=True)
+        return due
+
+    def record(self, ticker, ok, now):
+        """Note a refresh outcome; failures delay the ticker's next attempt."""
+        if ok:
+            self._failures.pop(ticker, None)
+            return
+        count = self._failures.get(ticker, (0, now))[0] + 1
+        delay = min(self.interval * 2 ** (count - 1), self.max_backoff)
+        self._failures[ticker] = (count, now + timedelta(seconds=delay))
+
+class WatchlistWorker:
+    """Refreshes every watched ticker in priority order with bounded concurrency.
+
+    Each cycle re-reads the watchlists and the newest saved analyses, takes
+    up to batch_size of the most urgent due tickers and runs analyze_ticker()
+    on at most ``concurrency`` of them at a time, saving each result through
+    save_analysis() so the dashboard can serve it without recomputing.
+    """
+
+    def __init__(self, scheduler=None, concurrency=WORKER_CONCURRENCY, batch_size=None,
+                 analyze=analyze_ticker, save=save_analysis, poll_seconds=30):
+        self.scheduler = scheduler or RefreshScheduler()
+        self.concurrency = concurrency
+        self.batch_size = batch_size or concurrency * 4
+        self.analyze = analyze
+        self.save = save
+        self.poll_seconds = poll_seconds
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='watchlist')
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def run_once(self, now=None):
+        """Refresh one batch of due tickers and return the ones that succeeded."""
+        now = now or datetime.now()
+        watched = get_watched_tickers()
+        if not watched:
+            return []
+        due = self.scheduler.plan(watched, get_latest_analysis_times(watched), now)[:self.batch_size]
+        futures = {self._executor.submit(self.analyze, ticker): ticker for ticker, _ in due}
+        refreshed = []
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                self.save(ticker, future.result())
+                refreshed.append(ticker)
+                self.scheduler.record(ticker, True, now)
+            except Exception as e:
+                print(f"Error refreshing {ticker}: {e}")
+                self.scheduler.record(ticker, False, now)
+        return refreshed
+
+    def run(self, stop=None):
+        """Refresh until stop is set, polling when nothing is due."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                refreshed = self.run_once()
+            except Exception as e:
+                print(f"Error in watchlist refresh cycle: {e}")
+                refreshed = []
+            print(f"Refreshed {len(refreshed)} tickers in {time.monotonic() - started:.1f}s")
+            record('worker.cycle', time.monotonic() - started, refreshed=len(refreshed))
+            # One metrics snapshot per cycle when METRICS_LOG is set
+            log_metrics()
+            # A full batch means more tickers may be due right away
+            if len(refreshed) < self.batch_size:
+                stop.wait(self.poll_seconds)
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh analyses for every watched ticker.")
+    parser.add_argument('--concurrency', type=int, default=WORKER_CONCURRENCY)
+    parser.add_argument('--interval', type=int, default=REFRESH_INTERVAL,
+                        help="seconds after which a calm ticker with one watcher is stale")
+    parser.add_argument('--poll', type=int, default=30, help="seconds to sleep when nothing is due")
+    parser.add_argument('--once', action='store_true', help="refresh one batch and exit")
+    args = parser.parse_args()
+
+    init_db()
+    worker = WatchlistWorker(
+        scheduler=RefreshScheduler(interval=args.interval),
+        concurrency=args.concurrency,
+        poll_seconds=args.poll
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        if args.once:
+            worker.run_once()
+        else:
+            worker.run(stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+        flush_analyses()
+
+if __name__ == '__main__':
+    main()